@@ -5,8 +5,6 @@ Subtitle Processor application, built using PyQt6.
 """
 import os
 import sys
-from queue import Queue
-from threading import Thread
 from typing import Optional
 
 from PyQt6.QtCore import QTimer, pyqtSignal, QObject, Qt
@@ -14,10 +12,15 @@ from PyQt6.QtGui import QFont, QIcon
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
                              QLabel, QPushButton, QFileDialog, QCheckBox,
                              QLineEdit, QComboBox, QProgressBar, QTextEdit,
-                             QMessageBox, QFrame, QSizePolicy)
+                             QMessageBox, QFrame, QSizePolicy, QTableView,
+                             QHeaderView, QAbstractItemView)
 
+from .preview_model import CuePreviewModel
+from .services.archive_service import ArchiveResult
 from .services.file_service import FileService
-from .services.subtitle_service import SubtitleService
+from .services.process_worker import ProcessingJob, ProcessWorker, WatchJob
+from .services.subtitle_formats import supported_extensions
+from .services.subtitle_service import SubtitleService, TranslationEstimate
 from .services.translation_service import TranslationService
 
 
@@ -45,9 +48,15 @@ class SubtitleProcessorGUI(QMainWindow):
         self.file_service = FileService()
         self.subtitle_service = SubtitleService()
         self.translation_service = TranslationService()
-        self.progress_queue = Queue()
+        self.worker = ProcessWorker()
+        # Watches run in a worker process of their own; a stopped watch keeps running
+        # until the files it was processing are abandoned, and its messages are read until then.
+        self.watch_worker = ProcessWorker()
+        self.watching = False
         self.timer = QTimer()
         self.progress_signal = ProgressSignal()
+        self.preview_model = CuePreviewModel()
+        self.archive_result: Optional[ArchiveResult] = None
 
         # Connect signals
         self.progress_signal.progress_updated.connect(self.handle_progress_update)
@@ -60,8 +69,8 @@ class SubtitleProcessorGUI(QMainWindow):
         Sets up the user interface of the main window, including all widgets and layouts.
         """
         self.setWindowTitle('SRT4U - Subtitle Processor')
-        self.setGeometry(100, 100, 600, 500)
-        self.setMinimumSize(500, 450)
+        self.setGeometry(100, 100, 900, 750)
+        self.setMinimumSize(500, 600)
 
         # Create central widget
         central_widget = QWidget()
@@ -95,7 +104,7 @@ class SubtitleProcessorGUI(QMainWindow):
 
         # File selection section
         file_layout = QVBoxLayout()
-        self.select_file_button = QPushButton('Select SRT/VTT file')
+        self.select_file_button = QPushButton('Select subtitle file')
         self.select_file_button.clicked.connect(self.handle_file_selection)
         file_layout.addWidget(self.select_file_button)
 
@@ -130,6 +139,10 @@ class SubtitleProcessorGUI(QMainWindow):
         lang_layout.addWidget(self.target_language)
         translation_layout.addLayout(lang_layout)
 
+        self.estimate_button = QPushButton('Estimate translation')
+        self.estimate_button.clicked.connect(self.estimate_translation)
+        translation_layout.addWidget(self.estimate_button)
+
         main_layout.addLayout(translation_layout)
 
         # Output format selection
@@ -157,25 +170,55 @@ class SubtitleProcessorGUI(QMainWindow):
         self.process_button.clicked.connect(self.process_subtitle_file)
         main_layout.addWidget(self.process_button)
 
+        # Cancel button
+        self.cancel_button = QPushButton('Cancel')
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_processing)
+        main_layout.addWidget(self.cancel_button)
+
+        # Watch mode button
+        self.watch_button = QPushButton('Watch folder')
+        self.watch_button.clicked.connect(self.toggle_watch_mode)
+        main_layout.addWidget(self.watch_button)
+
         # Result status
         self.result_status = QLabel('')
         self.result_status.setStyleSheet("font-size: 11px;")
         self.result_status.setWordWrap(True)
         main_layout.addWidget(self.result_status)
 
-        # Add stretch to push everything up
-        main_layout.addStretch()
+        # Cue preview: original vs processed text and timing. Rows have a fixed height so
+        # the view only lays out and renders the visible ones.
+        self.preview_table = QTableView()
+        self.preview_table.setModel(self.preview_model)
+        self.preview_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.preview_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.preview_table.setWordWrap(False)
+        self.preview_table.verticalHeader().setVisible(False)
+        self.preview_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.preview_table.verticalHeader().setDefaultSectionSize(22)
+        header = self.preview_table.horizontalHeader()
+        header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        header.resizeSection(0, 50)
+        header.resizeSection(1, 190)
+        header.resizeSection(3, 190)
+        self.preview_table.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
+        main_layout.addWidget(self.preview_table, 1)
 
     def handle_file_selection(self):
         """
-        Opens a file dialog to allow the user to select a subtitle file (.srt or .vtt).
-        Updates the GUI to reflect the selected file.
+        Opens a file dialog to allow the user to select a subtitle file in any of the
+        supported formats, or an archive of subtitle files. Updates the GUI to reflect
+        the selected file.
         """
+        patterns = ' '.join(f'*{extension}' for extension in supported_extensions())
         file_path, _ = QFileDialog.getOpenFileName(
             self,
-            'Select SRT/VTT file',
+            'Select subtitle file',
             '',
-            'Subtitle files (*.srt *.vtt);;All files (*.*)'
+            f'Subtitle files ({patterns});;Archives (*.zip *.tar.gz *.tgz *.gz);;All files (*.*)'
         )
 
         if file_path:
@@ -222,7 +265,8 @@ class SubtitleProcessorGUI(QMainWindow):
     def process_subtitle_file(self):
         """
         Starts the subtitle processing workflow. It validates inputs, prepares the UI,
-        and starts a new thread to handle the processing to avoid freezing the GUI.
+        and starts a worker process to handle the processing, so the GUI never waits
+        for it.
         """
         if not self._validate_inputs():
             return
@@ -230,18 +274,126 @@ class SubtitleProcessorGUI(QMainWindow):
         try:
             self._prepare_processing()
 
-            processing_thread = Thread(
-                target=self._run_processing,
-                args=(self.progress_queue,)
-            )
-            processing_thread.start()
+            translate = self.translation_toggle.isChecked()
+            self.worker.start(ProcessingJob(
+                self.input_file_path,
+                self.output_directory,
+                translate,
+                self.target_language.text().strip() if translate else None,
+                self.output_format
+            ))
 
-            # Start a timer to periodically check the progress queue for updates.
-            self.timer.start(100)  # Check every 100ms
+            # Start a timer to periodically check the worker for updates. The worker waits
+            # while the pipe is full, so it is checked often to keep it busy.
+            self.timer.start(20)  # Check every 20ms
+
+        except Exception as error:
+            self._handle_error(error)
+
+    def estimate_translation(self):
+        """
+        Starts a dry run in the worker process that parses the selected file without
+        translating it, and shows how many subtitles, characters and requests a
+        translated run needs and how long it is expected to take.
+        """
+        if not self.input_file_path:
+            self.show_notification('Please select a file', 'warning')
+            return
 
+        try:
+            self._prepare_processing()
+            self.processing_status.setText('Estimating translation...')
+            self.worker.start(ProcessingJob(
+                self.input_file_path,
+                self.output_directory or '',
+                True,
+                self.target_language.text().strip() or None,
+                self.output_format,
+                preview_limit=0,
+                dry_run=True
+            ))
+            self.timer.start(20)
         except Exception as error:
             self._handle_error(error)
 
+    def toggle_watch_mode(self):
+        """
+        Starts watching a directory chosen by the user, processing every new subtitle file
+        with the current options, or stops watching if a watch is already running.
+        """
+        if self.watching:
+            self._stop_watching()
+            return
+
+        if not self.output_directory:
+            self.show_notification('Please select output directory', 'warning')
+            return
+        translate = self.translation_toggle.isChecked()
+        target_language = self.target_language.text().strip()
+        if translate and not target_language:
+            self.show_notification('Please enter target language', 'warning')
+            return
+
+        directory = QFileDialog.getExistingDirectory(self, 'Select directory to watch', '')
+        if not directory:
+            return
+
+        # A previous watch that is still finishing is not needed anymore.
+        if self.watch_worker.is_running:
+            self.watch_worker.cancel()
+        self.watch_worker.start_watch(WatchJob(
+            directory,
+            self.output_directory,
+            translate,
+            target_language if translate else None,
+            self.output_format
+        ))
+        self.watching = True
+        self.timer.start(20)
+
+        self.watch_button.setText('Stop watching')
+        self.process_button.setEnabled(False)
+        self.estimate_button.setEnabled(False)
+        self.select_file_button.setEnabled(False)
+        self.select_dir_button.setEnabled(False)
+
+    def _stop_watching(self):
+        """
+        Stops the running watch. Files already being processed are abandoned in the
+        background, and the progress timer stops once the watch has ended.
+        """
+        self.watch_worker.stop()
+        self.watching = False
+        self.watch_button.setText('Watch folder')
+        self.process_button.setEnabled(True)
+        self.estimate_button.setEnabled(True)
+        self.select_file_button.setEnabled(True)
+        self.select_dir_button.setEnabled(True)
+
+    def cancel_processing(self):
+        """
+        Stops the running job. Its worker process removes the partial output in the
+        background.
+        """
+        if not self.worker.is_running:
+            return
+        self.worker.cancel()
+        self.processing_status.setText('Processing cancelled')
+        self._cleanup()
+
+    def closeEvent(self, event):
+        """
+        Stops the watch and the running job, if any, when the window is closed. Their
+        worker processes finish in the background.
+        """
+        if self.watching:
+            self._stop_watching()
+        if self.watch_worker.is_running:
+            self.watch_worker.cancel()
+        if self.worker.is_running:
+            self.worker.cancel()
+        super().closeEvent(event)
+
     def _validate_inputs(self) -> bool:
         """
         Validates that all necessary inputs (file, directory, language) are provided.
@@ -265,49 +417,47 @@ class SubtitleProcessorGUI(QMainWindow):
         Prepares the GUI for processing, disabling buttons and showing the progress bar.
         """
         self.process_button.setEnabled(False)
+        self.watch_button.setEnabled(False)
+        self.estimate_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
         self.progress_bar.setVisible(True)
         self.progress_bar.setValue(0)
         self.processing_status.setText('Starting process...')
         self.result_status.setText('')
-
-    def _run_processing(self, queue: Queue):
-        """
-        The target function for the worker thread. It calls the subtitle service
-        to process the file and puts the result or error into the queue.
-
-        Args:
-            queue (Queue): The queue to communicate with the main GUI thread.
-        """
-        try:
-            processed_text = self.subtitle_service.process_subtitles(
-                self.input_file_path,
-                self.translation_toggle.isChecked(),
-                self.target_language.text().strip() if self.translation_toggle.isChecked() else None,
-                lambda t, d: queue.put((t, d))
-            )
-            queue.put(('success', processed_text))
-        except Exception as error:
-            queue.put(('error', str(error)))
+        self.archive_result = None
+        self.preview_model.clear()
 
     def check_progress_queue(self):
         """
-        Periodically checks the progress queue for messages from the worker thread
-        and emits a signal to update the GUI.
+        Periodically checks the worker processes of the job and the watch for messages
+        and emits a signal to update the GUI. Cues for the preview arrive in batches
+        and are added to the model directly. The timer stops once neither is running.
         """
-        try:
-            while True:
-                msg_type, data = self.progress_queue.get_nowait()
+        for msg_type, data in self.worker.receive():
+            if msg_type == 'cues':
+                self.preview_model.append_cues(data)
+            else:
+                self.progress_signal.progress_updated.emit(msg_type, data)
+
+        for msg_type, data in self.watch_worker.receive():
+            if msg_type == 'error':
+                self.show_notification(f'Watch error: {data}', 'negative')
+            else:
                 self.progress_signal.progress_updated.emit(msg_type, data)
-        except:
-            pass  # Queue is empty
+        if self.watching and not self.watch_worker.is_running:
+            # The watch ended on its own, e.g. because of an error.
+            self._stop_watching()
+
+        if not self.worker.is_running and not self.watch_worker.is_running:
+            self.timer.stop()
 
     def handle_progress_update(self, msg_type: str, data):
         """
-        Handles progress updates received from the worker thread's signals.
+        Handles progress updates received from the worker's signals.
         Updates the progress bar, status labels, and handles success or error cases.
 
         Args:
-            msg_type (str): The type of message (e.g., 'progress', 'status', 'success').
+            msg_type (str): The type of message (e.g., 'progress', 'status', 'saved').
             data: The data associated with the message.
         """
         if msg_type == 'progress':
@@ -317,54 +467,47 @@ class SubtitleProcessorGUI(QMainWindow):
             self.processing_status.setText(f'Processing: {data}')
         elif msg_type == 'info':
             self.processing_status.setText(data)
-        elif msg_type == 'success':
-            self.timer.stop()
-            self._handle_success(data)
+        elif msg_type == 'archive':
+            self.archive_result = data
+        elif msg_type == 'saved':
+            self._handle_saved(data)
+        elif msg_type == 'estimate':
+            self._handle_estimate(data)
         elif msg_type == 'error':
-            self.timer.stop()
             self._handle_error(Exception(data))
 
-    def _save_processed_file(self, content: str) -> str:
+    def _handle_saved(self, output_path: str):
         """
-        Saves the processed subtitle content to a new file in the output directory.
+        Handles the successful completion of the processing task, once the worker
+        saved its output. For an archive, members that could not be processed are
+        listed with the result.
 
         Args:
-            content (str): The processed subtitle text.
-
-        Returns:
-            str: The path to the newly created output file.
-        """
-        base_name = os.path.basename(self.input_file_path)
-        name_without_ext = os.path.splitext(base_name)[0]
-        output_filename = f"{name_without_ext}_processed.{self.output_format}"
-        output_path = os.path.join(self.output_directory, output_filename)
-
-        # Add WEBVTT header if the format is vtt
-        if self.output_format == "vtt":
-            content = f"WEBVTT\n\n{content}"
-
-        with open(output_path, "w", encoding='UTF-8') as file:
-            file.write(content)
-
-        return output_path
+            output_path (str): The path to the saved output file.
+        """
+        self.processing_status.setText('Process completed')
+        if self.archive_result and self.archive_result.skipped:
+            summary = self.archive_result.summary()
+            self.show_notification(f'Archive processed with errors: {summary}', 'warning')
+            self.result_status.setText(f'File saved to: {output_path}\n{summary}')
+            self.result_status.setStyleSheet("color: #F9A825; font-size: 11px;")
+        else:
+            self.show_notification('File processed successfully', 'positive')
+            self.result_status.setText(f'File saved to: {output_path}')
+            self.result_status.setStyleSheet("color: #2E7D32; font-size: 11px;")
+        self._cleanup()
 
-    def _handle_success(self, processed_text: str):
+    def _handle_estimate(self, estimate: TranslationEstimate):
         """
-        Handles the successful completion of the processing task.
+        Shows the result of a translation dry run.
 
         Args:
-            processed_text (str): The final processed subtitle content.
+            estimate (TranslationEstimate): The estimated translation work for the file.
         """
-        try:
-            output_path = self._save_processed_file(processed_text)
-            self.processing_status.setText('Process completed')
-            self.show_notification('File processed successfully', 'positive')
-            self.result_status.setText(f'File saved to: {output_path}')
-            self.result_status.setStyleSheet("color: #2E7D32; font-size: 11px;")
-        except Exception as error:
-            self._handle_error(error)
-        finally:
-            self._cleanup()
+        self.processing_status.setText('Estimate completed')
+        self.result_status.setText(f'Translation estimate: {estimate.summary()}')
+        self.result_status.setStyleSheet("color: #AAA; font-size: 11px;")
+        self._cleanup()
 
     def _handle_error(self, error: Exception):
         """
@@ -384,6 +527,7 @@ class SubtitleProcessorGUI(QMainWindow):
         Performs cleanup actions after processing is finished (either success or error),
         such as resetting the UI after a delay.
         """
+        self.cancel_button.setEnabled(False)
         QTimer.singleShot(2000, self._reset_ui)  # Reset UI after 2 seconds
 
     def _reset_ui(self):
@@ -391,6 +535,9 @@ class SubtitleProcessorGUI(QMainWindow):
         Resets the user interface to its initial state after processing is complete.
         """
         self.process_button.setEnabled(True)
+        self.watch_button.setEnabled(True)
+        self.estimate_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         self.progress_bar.setVisible(False)
         if self.processing_status.text() == 'Process completed':
             self.processing_status.setText('')
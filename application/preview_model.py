@@ -0,0 +1,73 @@
+# application/preview_model.py
+"""
+This module contains the table model behind the cue preview in the GUI. Cues are
+inserted in batches, and the view only asks for the visible rows, so files with
+hundreds of thousands of cues can be previewed without freezing.
+"""
+from typing import Any, List, Tuple
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class CuePreviewModel(QAbstractTableModel):
+    """
+    A table model showing the original and processed version of each cue side by side.
+    """
+    HEADERS = ('#', 'Original timing', 'Original text', 'Processed timing', 'Processed text')
+
+    def __init__(self, parent=None):
+        """
+        Initializes the CuePreviewModel.
+
+        Args:
+            parent: The parent QObject.
+        """
+        super().__init__(parent)
+        self._rows: List[Tuple[str, str, str, str, str]] = []
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        value = self._rows[index.row()][index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            # Rows have a fixed height, so multi-line text is shown on one line.
+            return value.replace('\n', ' / ')
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return value
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation,
+                   role: int = Qt.ItemDataRole.DisplayRole) -> Any:
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def append_cues(self, cues: List[Tuple[str, str, str, str, str]]):
+        """
+        Adds cues produced by the worker as new rows at the end of the table, in a
+        single insertion per batch.
+
+        Args:
+            cues (List[Tuple[str, str, str, str, str]]): The index, original timing,
+                                                         original text, processed timing
+                                                         and processed text of each cue.
+        """
+        if not cues:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(cues) - 1)
+        self._rows.extend(cues)
+        self.endInsertRows()
+
+    def clear(self):
+        """
+        Removes all cues from the model.
+        """
+        self.beginResetModel()
+        self._rows = []
+        self.endResetModel()
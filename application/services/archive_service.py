@@ -0,0 +1,376 @@
+# application/services/archive_service.py
+"""
+This module provides a service for processing subtitle files packed in .zip, .tar.gz
+or .gz archives. Members are streamed from the archive straight into the subtitle
+parser and the results are written into an output archive, without extracting
+anything to disk.
+"""
+import gzip
+import io
+import multiprocessing
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import BinaryIO, Callable, Deque, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .file_service import FileService
+from .subtitle_formats import supported_extensions
+from .subtitle_service import SubtitleService
+
+# A member to process: its name and its content.
+ArchiveMember = Tuple[str, bytes]
+
+# Number of skipped members listed by name in a summary.
+_SKIPPED_NAMES_SHOWN = 5
+
+# Number of seconds between progress reports while waiting for a member, so the
+# progress callback can stop a cancelled job even while a large member is processed.
+_PROGRESS_INTERVAL = 0.25
+
+_ARCHIVE_EXTENSIONS = {
+    '.zip': 'zip',
+    '.tar.gz': 'tar',
+    '.tgz': 'tar',
+    '.gz': 'gzip',
+}
+
+# The subtitle service of a pool process that cleans members, created once per process.
+_member_service: Optional[SubtitleService] = None
+
+
+class ArchiveResult(NamedTuple):
+    """
+    The outcome of processing an archive: where the output was saved, how many members
+    were processed, and the name and reason of every member that was skipped.
+    """
+    output_path: str
+    processed: int
+    skipped: List[Tuple[str, str]]
+
+    def summary(self) -> str:
+        """
+        Describes how many members were processed and which ones were skipped.
+
+        Returns:
+            str: A one-line summary for the user.
+        """
+        total = self.processed + len(self.skipped)
+        summary = f"{self.processed} of {total} subtitle files processed"
+        if self.skipped:
+            summary += f"; skipped {_describe_skipped(self.skipped)}"
+        return summary
+
+
+def _describe_skipped(skipped: List[Tuple[str, str]]) -> str:
+    """
+    Lists the first few skipped members with their reasons.
+    """
+    described = ', '.join(f"{name} ({reason.rstrip('.')})"
+                          for name, reason in skipped[:_SKIPPED_NAMES_SHOWN])
+    if len(skipped) > _SKIPPED_NAMES_SHOWN:
+        described += f" and {len(skipped) - _SKIPPED_NAMES_SHOWN} more"
+    return described
+
+
+class ArchiveService:
+    """
+    A service class for processing every subtitle file in an archive in parallel.
+    Members that are translated are processed on threads, since they mostly wait for
+    the translation backend; members that are only cleaned are CPU-bound and are
+    processed in a pool of processes.
+    """
+    def __init__(self, subtitle_service: Optional[SubtitleService] = None,
+                 file_service: Optional[FileService] = None, max_workers: int = 4):
+        """
+        Initializes the ArchiveService.
+
+        Args:
+            subtitle_service (Optional[SubtitleService]): The service used to process members.
+            file_service (Optional[FileService]): The service used to name processed files.
+            max_workers (int): The maximum number of members processed at the same time,
+                               i.e. the number of threads or processes in the pool.
+        """
+        self.subtitle_service = subtitle_service or SubtitleService()
+        self.file_service = file_service or FileService()
+        self.max_workers = max_workers
+        self._extensions = tuple(supported_extensions())
+
+    def is_archive(self, path: str) -> bool:
+        """
+        Checks whether a file is a supported archive, based on its name.
+
+        Args:
+            path (str): The path to the file.
+
+        Returns:
+            bool: True if the file is a .zip, .tar.gz, .tgz or .gz archive.
+        """
+        return self._split_archive_name(path)[1] is not None
+
+    def process_archive(self, archive_path: str, output_directory: str, translate: bool,
+                        target_language: Optional[str], output_format: str,
+                        progress_callback: Callable) -> ArchiveResult:
+        """
+        Processes every subtitle file in an archive and writes the results into an
+        archive of the same type in the output directory.
+
+        Args:
+            archive_path (str): The path to the input archive.
+            output_directory (str): The directory to save the output archive in.
+            translate (bool): Whether to translate the subtitles.
+            target_language (Optional[str]): The target language for translation.
+            output_format (str): The output format of the members ('srt' or 'vtt').
+            progress_callback (Callable): A function to call for progress updates.
+
+        Returns:
+            ArchiveResult: The path to the output archive and the processed and
+                           skipped members.
+
+        Raises:
+            ValueError: If the file is not a supported archive or none of its members
+                        could be processed.
+        """
+        stem, archive_type = self._split_archive_name(archive_path)
+        if archive_type is None:
+            raise ValueError(f"Unsupported archive: {os.path.basename(archive_path)}")
+
+        if archive_type == 'gzip':
+            output_path = os.path.join(output_directory,
+                                       self.file_service.processed_file_name(stem, output_format) + '.gz')
+        else:
+            extension = '.zip' if archive_type == 'zip' else '.tar.gz'
+            output_path = os.path.join(output_directory, f"{stem}_processed{extension}")
+
+        progress_callback('status', f'Processing archive {os.path.basename(archive_path)}...')
+        skipped: List[Tuple[str, str]] = []
+        try:
+            if archive_type == 'zip':
+                processed = self._process_zip(archive_path, output_path, output_format, translate,
+                                              target_language, progress_callback, skipped)
+            elif archive_type == 'tar':
+                processed = self._process_tar(archive_path, output_path, output_format, translate,
+                                              target_language, progress_callback, skipped)
+            else:
+                processed = self._process_gzip(archive_path, output_path, output_format, translate,
+                                               target_language)
+        except BaseException:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
+
+        if not processed:
+            os.remove(output_path)
+            message = "No subtitle files could be processed in the archive."
+            if skipped:
+                message += f" Skipped {_describe_skipped(skipped)}."
+            raise ValueError(message)
+        result = ArchiveResult(output_path, processed, skipped)
+        progress_callback('info', result.summary())
+        progress_callback('progress', 1.0)
+        return result
+
+    def _process_zip(self, archive_path: str, output_path: str, output_format: str, translate: bool,
+                     target_language: Optional[str], progress_callback: Callable,
+                     skipped: List[Tuple[str, str]]) -> int:
+        """
+        Processes the members of a zip archive. Each member is read into memory only
+        when a worker is about to be free for it.
+        """
+        with zipfile.ZipFile(archive_path) as source, \
+                zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as target:
+            infos = [info for info in source.infolist()
+                     if not info.is_dir() and self._is_subtitle(info.filename)]
+            members = ((info.filename, source.read(info)) for info in infos)
+            used_names: Set[str] = set()
+
+            def write(name: str, content: str):
+                target.writestr(self._output_member_name(name, output_format, used_names),
+                                self.file_service.add_format_header(content, output_format))
+
+            return self._process_members(members, translate, target_language, write, progress_callback,
+                                         lambda done: done / max(len(infos), 1), skipped)
+
+    def _process_tar(self, archive_path: str, output_path: str, output_format: str, translate: bool,
+                     target_language: Optional[str], progress_callback: Callable,
+                     skipped: List[Tuple[str, str]]) -> int:
+        """
+        Processes the members of a compressed tar archive. The archive can only be read
+        front to back, so each member is read into memory and handed to a worker while
+        the next one is read.
+        """
+        size = max(os.path.getsize(archive_path), 1)
+        with open(archive_path, 'rb') as raw, \
+                tarfile.open(fileobj=raw, mode='r|*') as source, \
+                tarfile.open(output_path, 'w:gz') as target:
+
+            def members() -> Iterable[ArchiveMember]:
+                for member in source:
+                    if not member.isfile() or not self._is_subtitle(member.name):
+                        continue
+                    yield member.name, source.extractfile(member).read()
+
+            used_names: Set[str] = set()
+
+            def write(name: str, content: str):
+                data = self.file_service.add_format_header(content, output_format).encode('UTF-8')
+                info = tarfile.TarInfo(self._output_member_name(name, output_format, used_names))
+                info.size = len(data)
+                info.mtime = int(time.time())
+                target.addfile(info, io.BytesIO(data))
+
+            return self._process_members(members(), translate, target_language, write,
+                                         progress_callback, lambda done: raw.tell() / size, skipped)
+
+    def _process_gzip(self, archive_path: str, output_path: str, output_format: str, translate: bool,
+                      target_language: Optional[str]) -> int:
+        """
+        Processes a single gzip-compressed subtitle file, streaming it in this process.
+        """
+        with gzip.open(archive_path, 'rb') as stream:
+            content = _process_member(self.subtitle_service, stream, 0, translate, target_language)
+        with gzip.open(output_path, 'wt', encoding='UTF-8') as target:
+            target.write(self.file_service.add_format_header(content, output_format))
+        return 1
+
+    def _process_members(self, members: Iterable[ArchiveMember], translate: bool,
+                         target_language: Optional[str], write: Callable[[str, str], None],
+                         progress_callback: Callable, progress: Callable[[int], float],
+                         skipped: List[Tuple[str, str]]) -> int:
+        """
+        Processes members on a pool of workers and writes the results in archive order.
+        Translated members go to a pool of threads, members that are only cleaned to a
+        pool of processes, because cleaning holds the GIL and threads would run it one
+        member at a time.
+        At most twice as many members as there are workers are in flight, which bounds
+        the memory used for members read ahead and results waiting to be written.
+        Members that fail are added to `skipped` with the reason.
+
+        Returns:
+            int: The number of members processed successfully.
+        """
+        in_flight: Deque[Tuple[str, Future]] = deque()
+        processed = 0
+        done = 0
+
+        def collect():
+            nonlocal processed, done
+            name, future = in_flight.popleft()
+            while not wait([future], timeout=_PROGRESS_INTERVAL).done:
+                progress_callback('progress', min(progress(done), 1.0))
+            try:
+                write(name, future.result())
+                processed += 1
+            except Exception as error:
+                skipped.append((name, str(error)))
+                progress_callback('info', f"Skipped {name}: {error}")
+            done += 1
+            progress_callback('progress', min(progress(done), 1.0))
+
+        executor: Executor
+        if translate:
+            executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+            def process(data: bytes) -> str:
+                return _process_member(self.subtitle_service, io.BytesIO(data), len(data), True,
+                                       target_language)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                           mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_start_member_process)
+            process = _clean_member
+        try:
+            for name, data in members:
+                in_flight.append((name, executor.submit(process, data)))
+                while len(in_flight) >= self.max_workers * 2:
+                    collect()
+            while in_flight:
+                collect()
+        except BaseException:
+            # Don't wait for members still being processed, e.g. when the job is cancelled,
+            # so the partial output archive can be removed right away.
+            _stop_executor(executor)
+            raise
+        executor.shutdown()
+        return processed
+
+    def _split_archive_name(self, path: str) -> Tuple[str, Optional[str]]:
+        """
+        Splits an archive's file name into its stem and archive type.
+        """
+        name = os.path.basename(path)
+        lower_name = name.lower()
+        for extension, archive_type in _ARCHIVE_EXTENSIONS.items():
+            if lower_name.endswith(extension):
+                return name[:-len(extension)], archive_type
+        return name, None
+
+    def _is_subtitle(self, name: str) -> bool:
+        """
+        Checks whether an archive member is a subtitle file, based on its name.
+        """
+        return os.path.splitext(name)[1].lower() in self._extensions
+
+    def _output_member_name(self, name: str, output_format: str, used_names: Set[str]) -> str:
+        """
+        Builds the name of a processed member, keeping its directory inside the archive.
+        Members that would end up with the same name, such as `ep1.srt` and `ep1.vtt`,
+        keep their original extension, and a counter is added if that is taken as well.
+        Names are compared case-insensitively and recorded in `used_names`.
+        """
+        stem, extension = os.path.splitext(name)
+        output_name = f"{stem}.{output_format}"
+        if output_name.lower() in used_names:
+            output_name = f"{stem}{extension}.{output_format}"
+        counter = 2
+        while output_name.lower() in used_names:
+            output_name = f"{stem} ({counter}).{output_format}"
+            counter += 1
+        used_names.add(output_name.lower())
+        return output_name
+
+
+
+def _process_member(subtitle_service: SubtitleService, stream: BinaryIO, size: int, translate: bool,
+                    target_language: Optional[str]) -> str:
+    """
+    Processes a single member, streaming it into the subtitle service.
+    """
+    formatted_content: List[str] = []
+    written_blocks = subtitle_service.process_stream(stream, translate, target_language,
+                                                     lambda msg_type, data: None,
+                                                     formatted_content.append, size)
+    if not written_blocks:
+        raise ValueError("Could not find any valid subtitle blocks in the file.")
+    return ''.join(formatted_content)
+
+
+def _start_member_process():
+    """
+    Initializes a pool process that cleans members.
+    """
+    global _member_service
+    _member_service = SubtitleService()
+
+
+def _clean_member(data: bytes) -> str:
+    """
+    Cleans a single member without translating it. Runs in a pool process.
+    """
+    return _process_member(_member_service, io.BytesIO(data), len(data), False, None)
+
+
+def _stop_executor(executor: Executor):
+    """
+    Shuts down a pool without waiting for the members it is processing. The processes
+    of a process pool are terminated, since they cannot be interrupted otherwise.
+    """
+    processes = []
+    if isinstance(executor, ProcessPoolExecutor):
+        # ProcessPoolExecutor has no public way to stop its workers before Python 3.14.
+        processes = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
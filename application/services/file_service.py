@@ -47,6 +47,59 @@ class FileService:
             shutil.copyfileobj(upload_event.content, file)
         return temp_path
 
+    def processed_file_name(self, input_name: str, output_format: str) -> str:
+        """
+        Builds the name of a processed file from the name of its input file.
+
+        Args:
+            input_name (str): The name or path of the input file.
+            output_format (str): The output format ('srt' or 'vtt').
+
+        Returns:
+            str: The input name with a `_processed` suffix and the output format's extension.
+        """
+        name_without_ext = os.path.splitext(input_name)[0]
+        return f"{name_without_ext}_processed.{output_format}"
+
+    def add_format_header(self, content: str, output_format: str) -> str:
+        """
+        Adds the header the output format requires to processed subtitle content.
+
+        Args:
+            content (str): The processed subtitle text.
+            output_format (str): The output format ('srt' or 'vtt').
+
+        Returns:
+            str: The content ready to be written.
+        """
+        # Add WEBVTT header if the format is vtt
+        if output_format == "vtt":
+            return f"WEBVTT\n\n{content}"
+        return content
+
+    def save_processed_file(self, input_path: str, output_directory: str, output_format: str,
+                            content: str) -> str:
+        """
+        Saves processed subtitle content to the output directory,
+        named after the input file with a `_processed` suffix.
+
+        Args:
+            input_path (str): The path of the file that was processed.
+            output_directory (str): The directory to save the file in.
+            output_format (str): The output format ('srt' or 'vtt').
+            content (str): The processed subtitle text.
+
+        Returns:
+            str: The path to the newly created output file.
+        """
+        output_filename = self.processed_file_name(os.path.basename(input_path), output_format)
+        output_path = os.path.join(output_directory, output_filename)
+
+        with open(output_path, "w", encoding='UTF-8') as file:
+            file.write(self.add_format_header(content, output_format))
+
+        return output_path
+
     def get_output_directory(self) -> str:
         """
         Opens a system dialog to ask the user to select a directory.
@@ -0,0 +1,385 @@
+# application/services/process_worker.py
+"""
+This module runs subtitle processing jobs and folder watches in a separate worker
+process, so the CPU-heavy cleaning and parsing never competes with the GUI for the
+interpreter lock. The work is described by an immutable spec, and progress messages
+come back through a pipe in batches.
+"""
+import multiprocessing
+import os
+import signal
+import time
+from multiprocessing.connection import Connection
+from multiprocessing.synchronize import Event
+from threading import Lock, Thread
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+from .archive_service import ArchiveService
+from .file_service import FileService
+from .subtitle_service import SubtitleService, TranslationEstimate
+from .watch_service import WatchService
+
+# Number of preview cues sent to the GUI in one message.
+_CUE_BATCH_SIZE = 500
+
+# Maximum number of seconds cues are held back before they are sent.
+_CUE_BATCH_INTERVAL = 0.05
+
+# Number of seconds a cancelled job gets to stop on its own before it is terminated.
+_CANCEL_TIMEOUT = 5.0
+
+# Messages after which a worker process sends nothing more.
+_FINAL_MESSAGES = ('saved', 'estimate', 'stopped', 'error')
+
+
+class ProcessingJob(NamedTuple):
+    """
+    Everything the worker process needs to know about a job, captured in the GUI
+    thread before the job starts.
+    """
+    input_path: str
+    output_directory: str
+    translate: bool
+    target_language: Optional[str]
+    output_format: str
+    preview_limit: int = 500000
+    dry_run: bool = False
+
+
+class WatchJob(NamedTuple):
+    """
+    Everything the worker process needs to know to watch a directory, captured in the
+    GUI thread before the watch starts.
+    """
+    watch_directory: str
+    output_directory: str
+    translate: bool
+    target_language: Optional[str]
+    output_format: str
+
+
+class _JobCancelled(Exception):
+    """
+    Raised inside a job to abandon it once it is cancelled.
+    """
+
+
+class _MessageSender:
+    """
+    Sends progress messages from the worker process to the GUI. Preview cues are sent in
+    batches and progress only when it changed by at least a percent, so the pipe
+    carries few, larger messages.
+    """
+    def __init__(self, connection: Connection, preview_limit: int):
+        """
+        Initializes the _MessageSender.
+
+        Args:
+            connection (Connection): The sending end of the pipe to the GUI.
+            preview_limit (int): The maximum number of preview cues to send.
+        """
+        self._connection = connection
+        self._preview_limit = preview_limit
+        self._cues: List[Any] = []
+        self._cues_sent = 0
+        self._last_flush = time.monotonic()
+        self._last_progress = -1.0
+
+    def send(self, msg_type: str, data: Any):
+        """
+        Sends a progress message, or holds it back to be sent with the next batch.
+
+        Args:
+            msg_type (str): The type of message (e.g., 'progress', 'cue', 'saved').
+            data (Any): The data associated with the message.
+        """
+        if msg_type == 'cue':
+            if self._cues_sent + len(self._cues) < self._preview_limit:
+                self._cues.append(data)
+            if (len(self._cues) >= _CUE_BATCH_SIZE
+                    or time.monotonic() - self._last_flush >= _CUE_BATCH_INTERVAL):
+                self.flush()
+            return
+        if msg_type == 'progress':
+            if data - self._last_progress < 0.01 and data < 1.0:
+                return
+            self._last_progress = data
+        self.flush()
+        self._connection.send((msg_type, data))
+
+    def flush(self):
+        """
+        Sends the preview cues held back so far.
+        """
+        if self._cues:
+            self._connection.send(('cues', self._cues))
+            self._cues_sent += len(self._cues)
+            self._cues = []
+        self._last_flush = time.monotonic()
+
+
+def _run_job(job: ProcessingJob, connection: Connection, cancel_event: Event):
+    """
+    Entry point of the worker process. Processes the job and reports the path of the
+    saved output, the translation estimate of a dry run, or the error, as the last message.
+    The job checks `cancel_event` whenever it reports progress and stops once it is set.
+    """
+    # Turn termination into an exception as well, so a job that is terminated because it
+    # did not notice the cancellation in time still removes its partial output (POSIX only).
+    signal.signal(signal.SIGTERM, _exit_on_terminate)
+    sender = _MessageSender(connection, job.preview_limit)
+
+    def progress_callback(msg_type: str, data: Any):
+        if cancel_event.is_set():
+            raise _JobCancelled()
+        # Errors are raised as well, so only the final one is reported.
+        if msg_type != 'error':
+            sender.send(msg_type, data)
+
+    try:
+        if job.dry_run:
+            sender.send('estimate', _estimate_job(job, progress_callback))
+        else:
+            sender.send('saved', _process_job(job, progress_callback))
+    except _JobCancelled:
+        # Cancelled, and the partial output is removed by now. Exit without waiting for
+        # threads still busy with requests that nobody needs anymore.
+        connection.close()
+        os._exit(1)
+    except Exception as error:
+        sender.send('error', str(error))
+    except SystemExit:
+        # Terminated, and the partial output is removed by now.
+        connection.close()
+        os._exit(1)
+    finally:
+        connection.close()
+
+
+def _run_watch(job: WatchJob, connection: Connection, stop_event: Event):
+    """
+    Entry point of a worker process that watches a directory. Forwards the messages of
+    the watch until `stop_event` is set, then sends 'stopped' as the last message, or
+    'error' if the watch ended on its own.
+    """
+    lock = Lock()
+
+    def progress_callback(msg_type: str, data: Any):
+        # Files are processed on several threads.
+        with lock:
+            try:
+                connection.send((msg_type, data))
+            except OSError:
+                pass  # The watch was cancelled and its messages are not read anymore.
+
+    try:
+        watcher = WatchService(job.watch_directory, job.output_directory, job.translate,
+                               job.target_language, job.output_format,
+                               progress_callback=progress_callback)
+        watcher.start()
+        while watcher.is_alive() and not stop_event.wait(0.5):
+            pass
+        watcher.stop()
+        watcher.join()
+        if stop_event.is_set():
+            progress_callback('stopped', None)
+        else:
+            progress_callback('error', f"Watching {job.watch_directory} stopped unexpectedly")
+    except Exception as error:
+        progress_callback('error', str(error))
+    finally:
+        connection.close()
+
+
+def _exit_on_terminate(signum: int, frame: Any):
+    """
+    Signal handler that ends the worker process through a SystemExit exception.
+    """
+    raise SystemExit(1)
+
+
+def _estimate_job(job: ProcessingJob, progress_callback: Callable) -> TranslationEstimate:
+    """
+    Parses a subtitle file without translating or saving it and estimates how much
+    translation work it needs.
+
+    Returns:
+        TranslationEstimate: The estimate for the file.
+    """
+    if ArchiveService().is_archive(job.input_path):
+        raise ValueError("Translation estimates are only available for single subtitle files.")
+    return SubtitleService().estimate_translation(job.input_path, progress_callback)
+
+
+def _process_job(job: ProcessingJob, progress_callback: Callable) -> str:
+    """
+    Processes a single subtitle file or an archive and saves the result. For an archive,
+    an 'archive' message with the processed and skipped members is sent first.
+
+    Returns:
+        str: The path to the saved output file.
+    """
+    file_service = FileService()
+    subtitle_service = SubtitleService()
+    archive_service = ArchiveService(subtitle_service, file_service)
+    target_language = job.target_language if job.translate else None
+
+    if archive_service.is_archive(job.input_path):
+        result = archive_service.process_archive(job.input_path, job.output_directory, job.translate,
+                                                 target_language, job.output_format, progress_callback)
+        progress_callback('archive', result)
+        return result.output_path
+
+    output_path = os.path.join(job.output_directory,
+                               file_service.processed_file_name(os.path.basename(job.input_path),
+                                                                job.output_format))
+    # Blocks are written as soon as they are ready, so the output never has to be held in
+    # memory as a whole or sent back to the GUI. A previous output is only replaced once
+    # the new one is complete.
+    partial_path = f"{output_path}.part"
+    try:
+        with open(partial_path, "w", encoding='UTF-8') as file:
+            file.write(file_service.add_format_header('', job.output_format))
+            with open(job.input_path, "rb") as stream:
+                written_blocks = subtitle_service.process_stream(
+                    stream, job.translate, target_language, progress_callback, file.write,
+                    os.path.getsize(job.input_path))
+        if not written_blocks:
+            raise ValueError("Could not find any valid subtitle blocks in the file.")
+        os.replace(partial_path, output_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return output_path
+
+
+class ProcessWorker:
+    """
+    Runs a processing job or a directory watch in a separate process and collects its
+    messages.
+    """
+    def __init__(self):
+        """
+        Initializes the ProcessWorker.
+        """
+        # Spawn a fresh interpreter instead of forking the GUI process with its Qt state.
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._connection: Optional[Connection] = None
+        self._stop_event: Optional[Event] = None
+
+    @property
+    def is_running(self) -> bool:
+        """
+        bool: Whether a job or watch was started and its messages are still being collected.
+        """
+        return self._connection is not None
+
+    def start(self, job: ProcessingJob):
+        """
+        Starts a job in a new worker process.
+
+        Args:
+            job (ProcessingJob): The job to run.
+        """
+        self._start(_run_job, job)
+
+    def start_watch(self, job: WatchJob):
+        """
+        Starts watching a directory in a new worker process. The watch runs until `stop`
+        or `cancel` is called.
+
+        Args:
+            job (WatchJob): The directory to watch and the options to process files with.
+        """
+        self._start(_run_watch, job)
+
+    def _start(self, target: Callable, job: NamedTuple):
+        """
+        Starts a worker process running `target` with the job, the sending end of the
+        pipe and the event that stops it.
+        """
+        receiver, sender = self._context.Pipe(duplex=False)
+        self._stop_event = self._context.Event()
+        # Not a daemon, since archive jobs start a pool of processes of their own. Jobs
+        # still running when the GUI closes are cancelled by it.
+        self._process = self._context.Process(target=target, args=(job, sender, self._stop_event))
+        self._process.start()
+        # The child owns the sending end now; closing ours lets recv() see EOF if it dies.
+        sender.close()
+        self._connection = receiver
+
+    def receive(self, time_budget: float = 0.015) -> List[Tuple[str, Any]]:
+        """
+        Collects the messages the worker process has sent so far, spending at most about
+        `time_budget` seconds so the caller's event loop stays responsive.
+
+        Args:
+            time_budget (float): The maximum number of seconds to spend reading.
+
+        Returns:
+            List[Tuple[str, Any]]: The messages, as (type, data) tuples.
+        """
+        messages = []
+        if self._connection is None:
+            return messages
+        deadline = time.monotonic() + time_budget
+        try:
+            while time.monotonic() < deadline and self._connection.poll():
+                message = self._connection.recv()
+                messages.append(message)
+                if message[0] in _FINAL_MESSAGES:
+                    self._finish()
+                    break
+        except (EOFError, OSError):
+            messages.append(('error', 'The worker process exited unexpectedly'))
+            self._finish()
+        return messages
+
+    def stop(self):
+        """
+        Asks the running watch to stop. Its messages are still collected until it sends
+        the last one, so the caller learns which files were abandoned.
+        """
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def cancel(self):
+        """
+        Asks the running job or watch to stop and stops collecting its messages. A job
+        stops the next time it reports progress and removes its partial output; the
+        worker process is only terminated if it does not exit within a few seconds.
+        """
+        self.stop()
+        self._finish(cancelled=True)
+
+    def _finish(self, cancelled: bool = False):
+        """
+        Closes the pipe and reaps the worker process in the background, so the caller
+        does not wait while a cancelled job removes its partial output.
+
+        Args:
+            cancelled (bool): Whether the job was cancelled and may still be running.
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+        if self._process is not None:
+            Thread(target=self._reap, args=(self._process, cancelled), daemon=True).start()
+            self._process = None
+        self._stop_event = None
+
+    @staticmethod
+    def _reap(process: multiprocessing.process.BaseProcess, cancelled: bool):
+        """
+        Waits for a worker process to exit. A cancelled job is terminated if it does not
+        stop in time, and a process that does not exit after that either is killed.
+        """
+        if cancelled:
+            process.join(timeout=_CANCEL_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        process.join(timeout=2)
+        if process.is_alive():
+            process.kill()
+            process.join()
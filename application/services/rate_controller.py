@@ -0,0 +1,165 @@
+# application/services/rate_controller.py
+"""
+This module provides an adaptive rate controller that limits the number of
+concurrent requests and the request rate sent to a translation backend.
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+
+class AdaptiveRateController:
+    """
+    Limits concurrency and request rate using additive-increase/multiplicative-decrease
+    (AIMD). Both limits grow slowly while requests succeed within the latency target and
+    are cut back sharply when the backend throttles, fails, or slows down.
+    """
+    def __init__(self, initial_concurrency: int = 2, min_concurrency: int = 1, max_concurrency: int = 8,
+                 initial_rate: float = 5.0, min_rate: float = 0.5, max_rate: float = 20.0,
+                 rate_increase: float = 1.0, decrease_factor: float = 0.5,
+                 latency_target: float = 2.0, latency_smoothing: float = 0.2,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initializes the AdaptiveRateController.
+
+        Args:
+            initial_concurrency (int): The number of concurrent requests allowed at start.
+            min_concurrency (int): The lower bound for concurrent requests.
+            max_concurrency (int): The upper bound for concurrent requests.
+            initial_rate (float): The requests per second allowed at start.
+            min_rate (float): The lower bound for requests per second.
+            max_rate (float): The upper bound for requests per second.
+            rate_increase (float): How many requests per second are added over one second
+                                   of successful requests.
+            decrease_factor (float): The factor both limits are multiplied by on congestion.
+            latency_target (float): Requests slower than this many seconds count as congestion.
+            latency_smoothing (float): The weight of the newest sample in the average latency.
+            clock (Callable[[], float]): The monotonic clock used for pacing.
+            sleep (Callable[[float], None]): The function used to wait between requests.
+        """
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_increase = rate_increase
+        self.decrease_factor = decrease_factor
+        self.latency_target = latency_target
+        self.latency_smoothing = latency_smoothing
+        self.concurrency = float(min(max(initial_concurrency, min_concurrency), max_concurrency))
+        self.rate = float(min(max(initial_rate, min_rate), max_rate))
+        self.average_latency: Optional[float] = None
+        self.in_flight = 0
+        self.success_count = 0
+        self.throttled_count = 0
+        self.error_count = 0
+        self._clock = clock
+        self._sleep = sleep
+        self._condition = threading.Condition()
+        self._next_request_time = 0.0
+        self._last_decrease_time: Optional[float] = None
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent, respecting both the concurrency limit and
+        the request rate. Every call must be followed by one of `on_success`,
+        `on_throttled`, `on_error`, or `release`.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.concurrency):
+                self._condition.wait()
+            self.in_flight += 1
+            now = self._clock()
+            send_time = max(now, self._next_request_time)
+            self._next_request_time = send_time + 1.0 / self.rate
+        if send_time > now:
+            self._sleep(send_time - now)
+
+    def on_success(self, latency: float):
+        """
+        Records a successful request and raises the limits if it was fast enough.
+
+        Args:
+            latency (float): How long the request took, in seconds.
+        """
+        with self._condition:
+            self.success_count += 1
+            if self.average_latency is None:
+                self.average_latency = latency
+            else:
+                self.average_latency += self.latency_smoothing * (latency - self.average_latency)
+
+            if latency > self.latency_target:
+                self._decrease()
+            else:
+                # One extra request in flight per window of successful requests, and
+                # `rate_increase` requests per second for every second of them.
+                self.concurrency = min(self.max_concurrency, self.concurrency + 1.0 / self.concurrency)
+                self.rate = min(self.max_rate, self.rate + self.rate_increase / self.rate)
+            self._finish()
+
+    def on_throttled(self):
+        """
+        Records a request rejected by the backend for exceeding its rate limit.
+        """
+        with self._condition:
+            self.throttled_count += 1
+            self._decrease()
+            # Hold back the next request for one full interval at the reduced rate.
+            self._next_request_time = max(self._next_request_time, self._clock() + 1.0 / self.rate)
+            self._finish()
+
+    def on_error(self):
+        """
+        Records a request that failed with a transient error such as a timeout.
+        """
+        with self._condition:
+            self.error_count += 1
+            self._decrease()
+            self._finish()
+
+    def release(self):
+        """
+        Frees the slot of a request without treating its outcome as a congestion signal,
+        e.g. when it failed because of invalid input.
+        """
+        with self._condition:
+            self._finish()
+
+    def estimate_duration(self, requests: int) -> float:
+        """
+        Estimates how long a number of requests will take at the current limits.
+
+        Args:
+            requests (int): The number of requests to send.
+
+        Returns:
+            float: The estimated duration in seconds.
+        """
+        with self._condition:
+            throughput = self.rate
+            if self.average_latency is not None:
+                throughput = min(throughput, int(self.concurrency) / max(self.average_latency, 1e-6))
+            return requests / throughput
+
+    def _decrease(self):
+        """
+        Cuts both limits multiplicatively, at most once per average request latency so
+        that a burst of failures from the same congested period counts only once.
+        Must be called with the condition held.
+        """
+        now = self._clock()
+        window = self.average_latency if self.average_latency is not None else self.latency_target
+        if self._last_decrease_time is not None and now - self._last_decrease_time < window:
+            return
+        self._last_decrease_time = now
+        self.concurrency = max(self.min_concurrency, self.concurrency * self.decrease_factor)
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    def _finish(self):
+        """
+        Frees a request slot and wakes up waiting requests. Must be called with the
+        condition held.
+        """
+        self.in_flight -= 1
+        self._condition.notify_all()
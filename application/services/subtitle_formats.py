@@ -0,0 +1,383 @@
+# application/services/subtitle_formats.py
+"""
+This module provides single-pass tokenizers for the supported subtitle formats.
+Every format backend turns a stream of lines into the same `Cue` model, and the
+format of a file is detected from a sample of its content.
+"""
+import re
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class Cue(NamedTuple):
+    """
+    A single subtitle cue. Timestamps are kept as written for SRT and VTT input and
+    converted to SRT notation (HH:MM:SS,mmm) for the other formats.
+    """
+    start: str
+    end: str
+    lines: List[str]
+    identifier: Optional[str] = None
+    settings: str = ''
+
+
+# Tokenizer states shared by the block-based formats.
+_START = 0
+_HEADER = 1
+_IDLE = 2
+_IDENTIFIER = 3
+_TEXT = 4
+_SKIP = 5
+
+_ASS_OVERRIDE_TAGS = re.compile(r'\{[^}]*\}')
+_ASS_SECTION = re.compile(r'^\[(Script Info|Events)\]', re.MULTILINE)
+_SBV_TIMING = re.compile(r'^(\d+:\d{1,2}:\d{1,2}[.,]\d+),(\d+:\d{1,2}:\d{1,2}[.,]\d+)$')
+_DEFAULT_ASS_FIELDS = ['layer', 'start', 'end', 'style', 'name',
+                       'marginl', 'marginr', 'marginv', 'effect', 'text']
+
+
+def _split_timing(line: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Splits a timing line such as `00:00:01,000 --> 00:00:02,000 align:start`. The
+    non-standard separator ` - ` is accepted as well.
+
+    Args:
+        line (str): The stripped line.
+
+    Returns:
+        Optional[Tuple[str, str, str]]: The start, end and trailing settings, or None
+                                        if the line is not a timing line.
+    """
+    start, separator, rest = line.partition('-->')
+    if not separator:
+        start, separator, rest = line.partition(' - ')
+        if not separator:
+            return None
+    start = start.strip()
+    if not start[:1].isdigit():
+        return None
+    parts = rest.split(None, 1)
+    if not parts:
+        return None
+    return start, parts[0], parts[1] if len(parts) > 1 else ''
+
+
+def _to_srt_time(value: str) -> str:
+    """
+    Converts a timestamp such as `0:00:01.50` to SRT notation (`00:00:01,500`).
+
+    Args:
+        value (str): The timestamp to convert.
+
+    Returns:
+        str: The timestamp in SRT notation.
+
+    Raises:
+        ValueError: If the value is not a valid timestamp.
+    """
+    clock, _, fraction = value.strip().replace(',', '.').partition('.')
+    parts = [int(part) for part in clock.split(':')]
+    if len(parts) > 3:
+        raise ValueError(f"Invalid timestamp: {value}")
+    hours, minutes, seconds = [0] * (3 - len(parts)) + parts
+    milliseconds = int((fraction + '000')[:3])
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+class SubtitleFormat(ABC):
+    """
+    Base class for a subtitle format backend.
+    """
+    name = ''
+    extensions: Tuple[str, ...] = ()
+
+    @abstractmethod
+    def detect(self, sample: str) -> bool:
+        """
+        Checks whether a sample from the start of a file is in this format.
+
+        Args:
+            sample (str): The first few kilobytes of the file.
+
+        Returns:
+            bool: True if the sample looks like this format, False otherwise.
+        """
+
+    @abstractmethod
+    def parse(self, lines: Iterable[str]) -> Iterator[Cue]:
+        """
+        Tokenizes the lines of a file into cues in a single pass.
+
+        Args:
+            lines (Iterable[str]): The lines of the file, without line endings.
+
+        Yields:
+            Cue: Each cue that has at least one line of text.
+        """
+
+
+class SrtFormat(SubtitleFormat):
+    """
+    SubRip (.srt). Tolerates missing index numbers, ` - ` as the timing separator,
+    and missing blank lines between cues.
+    """
+    name = 'srt'
+    extensions = ('.srt',)
+
+    def detect(self, sample: str) -> bool:
+        # SRT is the fallback for anything that has no stronger signature.
+        return True
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Cue]:
+        state = _IDLE
+        index = None
+        timing = None
+        text: List[str] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                if state == _TEXT and text:
+                    yield Cue(timing[0], timing[1], text, index, timing[2])
+                state = _IDLE
+                index = None
+                text = []
+                continue
+
+            if state == _IDLE:
+                if line.isdigit():
+                    index = line
+                    state = _IDENTIFIER
+                else:
+                    timing = _split_timing(line)
+                    state = _TEXT if timing else _SKIP
+            elif state == _IDENTIFIER:
+                timing = _split_timing(line)
+                state = _TEXT if timing else _SKIP
+            elif state == _TEXT:
+                next_timing = _split_timing(line) if '-->' in line else None
+                if next_timing is None:
+                    text.append(line)
+                    continue
+                # A new cue started without a blank line; its index ended up in the text.
+                next_index = text.pop() if text and text[-1].isdigit() else None
+                if text:
+                    yield Cue(timing[0], timing[1], text, index, timing[2])
+                index = next_index
+                timing = next_timing
+                text = []
+
+        if state == _TEXT and text:
+            yield Cue(timing[0], timing[1], text, index, timing[2])
+
+
+class VttFormat(SubtitleFormat):
+    """
+    WebVTT (.vtt). Cue identifiers and settings are kept on the cue; the header and
+    NOTE, STYLE and REGION blocks are skipped.
+    """
+    name = 'vtt'
+    extensions = ('.vtt',)
+
+    def detect(self, sample: str) -> bool:
+        return sample.lstrip().startswith('WEBVTT')
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Cue]:
+        state = _START
+        identifier = None
+        timing = None
+        text: List[str] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                if state == _TEXT and text:
+                    yield Cue(timing[0], timing[1], text, identifier, timing[2])
+                if state != _START:
+                    state = _IDLE
+                identifier = None
+                text = []
+                continue
+
+            if state == _START:
+                if line.startswith('WEBVTT'):
+                    state = _HEADER
+                    continue
+                state = _IDLE
+            if state == _HEADER:
+                # Header metadata runs until the first blank line, unless a malformed
+                # file starts its first cue right after the header.
+                if '-->' not in line or _split_timing(line) is None:
+                    continue
+                state = _IDLE
+
+            if state == _IDLE:
+                if '-->' in line:
+                    timing = _split_timing(line)
+                    state = _TEXT if timing else _SKIP
+                elif line.split(None, 1)[0] in ('NOTE', 'STYLE', 'REGION'):
+                    state = _SKIP
+                else:
+                    identifier = line
+                    state = _IDENTIFIER
+            elif state == _IDENTIFIER:
+                timing = _split_timing(line)
+                state = _TEXT if timing else _SKIP
+            elif state == _TEXT:
+                if '-->' not in line:
+                    text.append(line)
+                    continue
+                next_timing = _split_timing(line)
+                if next_timing is None:
+                    text.append(line)
+                    continue
+                # A new cue started without a blank line.
+                if text:
+                    yield Cue(timing[0], timing[1], text, identifier, timing[2])
+                identifier = None
+                timing = next_timing
+                text = []
+
+        if state == _TEXT and text:
+            yield Cue(timing[0], timing[1], text, identifier, timing[2])
+
+
+class AssFormat(SubtitleFormat):
+    """
+    Advanced SubStation Alpha and SubStation Alpha (.ass, .ssa). Dialogue events are
+    read from the [Events] section; override tags are removed from the text.
+    """
+    name = 'ass'
+    extensions = ('.ass', '.ssa')
+
+    def detect(self, sample: str) -> bool:
+        return _ASS_SECTION.search(sample) is not None
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Cue]:
+        in_events = False
+        fields = _DEFAULT_ASS_FIELDS
+        for line in lines:
+            line = line.strip()
+            if not line or line[0] == ';':
+                continue
+            if line[0] == '[':
+                in_events = line.lower() == '[events]'
+                continue
+            if not in_events:
+                continue
+
+            key, _, value = line.partition(':')
+            if key == 'Format':
+                fields = [field.strip().lower() for field in value.split(',')]
+            elif key == 'Dialogue':
+                values = value.split(',', len(fields) - 1)
+                if len(values) < len(fields):
+                    continue
+                event = dict(zip(fields, values))
+                text = _ASS_OVERRIDE_TAGS.sub('', event.get('text', ''))
+                text = text.replace('\\N', '\n').replace('\\n', '\n').replace('\\h', ' ')
+                cue_lines = [text_line.strip() for text_line in text.split('\n') if text_line.strip()]
+                if not cue_lines:
+                    continue
+                try:
+                    start = _to_srt_time(event['start'])
+                    end = _to_srt_time(event['end'])
+                except (KeyError, ValueError):
+                    continue
+                yield Cue(start, end, cue_lines, None, event.get('style', '').strip())
+
+
+class SbvFormat(SubtitleFormat):
+    """
+    YouTube SubViewer (.sbv): a `start,end` timing line followed by the text.
+    """
+    name = 'sbv'
+    extensions = ('.sbv',)
+
+    def detect(self, sample: str) -> bool:
+        first_line = sample.lstrip().split('\n', 1)[0].strip()
+        return _SBV_TIMING.match(first_line) is not None
+
+    def parse(self, lines: Iterable[str]) -> Iterator[Cue]:
+        state = _IDLE
+        timing = None
+        text: List[str] = []
+        for line in lines:
+            line = line.strip()
+            if not line:
+                if state == _TEXT and text:
+                    yield Cue(timing[0], timing[1], text)
+                state = _IDLE
+                text = []
+                continue
+
+            if state == _IDLE:
+                match = _SBV_TIMING.match(line)
+                if match:
+                    timing = (_to_srt_time(match.group(1)), _to_srt_time(match.group(2)))
+                    state = _TEXT
+                else:
+                    state = _SKIP
+            elif state == _TEXT:
+                text.append(line)
+
+        if state == _TEXT and text:
+            yield Cue(timing[0], timing[1], text)
+
+
+# Formats are tried in order; SRT accepts anything, so it must stay last.
+_FORMATS: List[SubtitleFormat] = [VttFormat(), AssFormat(), SbvFormat(), SrtFormat()]
+
+
+def register_format(subtitle_format: SubtitleFormat):
+    """
+    Registers an additional format backend. It takes precedence over the built-in
+    formats during detection, except that SRT stays the fallback.
+
+    Args:
+        subtitle_format (SubtitleFormat): The format backend to register.
+    """
+    _FORMATS.insert(0, subtitle_format)
+
+
+def get_format(name: str) -> SubtitleFormat:
+    """
+    Looks up a format backend by its name.
+
+    Args:
+        name (str): The name of the format (e.g., 'srt', 'vtt').
+
+    Returns:
+        SubtitleFormat: The matching format backend.
+
+    Raises:
+        ValueError: If no format with this name is registered.
+    """
+    for subtitle_format in _FORMATS:
+        if subtitle_format.name == name:
+            return subtitle_format
+    raise ValueError(f"Unsupported subtitle format: {name}")
+
+
+def detect_format(sample: str) -> SubtitleFormat:
+    """
+    Detects the format of a file from a sample of its content.
+
+    Args:
+        sample (str): The first few kilobytes of the file.
+
+    Returns:
+        SubtitleFormat: The first format backend that recognises the sample.
+    """
+    for subtitle_format in _FORMATS:
+        if subtitle_format.detect(sample):
+            return subtitle_format
+    return _FORMATS[-1]
+
+
+def supported_extensions() -> List[str]:
+    """
+    Lists the file extensions of all registered formats.
+
+    Returns:
+        List[str]: The extensions, including the leading dot.
+    """
+    return [extension for subtitle_format in _FORMATS for extension in subtitle_format.extensions]
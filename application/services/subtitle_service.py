@@ -1,8 +1,58 @@
 # application/services/subtitle_service.py
+import io
+import os
 import re
-from typing import Optional, Callable, List
+from itertools import chain
+from queue import Queue
+from threading import Event, Semaphore, Thread
+from typing import BinaryIO, Optional, Callable, Generator, List, NamedTuple
+from .subtitle_formats import Cue, detect_format
 from .translation_service import TranslationService
 
+# Number of characters read from the start of a file to detect its format.
+_DETECTION_SAMPLE_SIZE = 4096
+
+# Number of cues whose text is cleaned in one pass.
+_CLEAN_BATCH_SIZE = 256
+
+# Joins the texts of a batch of cues; none of the spam patterns can match across it.
+_CUE_SEPARATOR = '\n\x00\n'
+
+# Marks the end of the stream between pipeline stages.
+_END_OF_STREAM = object()
+
+
+class TranslationEstimate(NamedTuple):
+    """
+    The amount of translation work a subtitle file needs, as computed by a dry run.
+    """
+    blocks: int
+    characters: int
+    requests: int
+    estimated_seconds: float
+
+    def summary(self) -> str:
+        """
+        Describes the estimate in one line for the user.
+
+        Returns:
+            str: The number of subtitles, characters and requests and the estimated duration.
+        """
+        minutes, seconds = divmod(int(round(self.estimated_seconds)), 60)
+        return (f"{self.blocks} subtitles, {self.characters} characters, "
+                f"{self.requests} translation requests, about {minutes}m {seconds:02d}s")
+
+
+class _ParsedBlock(NamedTuple):
+    """
+    A subtitle block travelling through the pipeline, together with the cue it was
+    parsed from and how far into the file the parser was when it was read.
+    """
+    block: List[str]
+    original_timing: str
+    original_text: str
+    offset: int
+
 
 class SubtitleService:
     """
@@ -10,13 +60,18 @@ class SubtitleService:
     and optimizing subtitle blocks.
     """
 
-    def __init__(self, batch_size: int = 50):
+    def __init__(self, batch_size: int = 50, translation_workers: int = 8, queue_size: int = 64):
         """
         Initializes the SubtitleService.
 
         Args:
             batch_size (int): The number of subtitle blocks to process in a batch
                               for operations like translation.
+            translation_workers (int): The maximum number of blocks translated concurrently.
+                                       The rate controller of the translation service
+                                       decides how many of them are actually used.
+            queue_size (int): The maximum number of blocks in flight between the
+                              pipeline stages.
         """
         self.translation_service = TranslationService()
         self.spam_patterns = [
@@ -34,6 +89,8 @@ class SubtitleService:
             r".*?/[a-zA-Z0-9]{12}.*",  # Matches any line containing a Telegram ID
         ]
         self.batch_size = batch_size
+        self.translation_workers = translation_workers
+        self.queue_size = queue_size
 
     def process_subtitles(self, file_path: str, translate: bool, target_language: Optional[str],
                           progress_callback: Callable) -> str:
@@ -41,6 +98,12 @@ class SubtitleService:
         Main method to process a subtitle file. It reads, cleans, translates (optional),
         optimizes, and formats the subtitles.
 
+        The stages run as a pipeline: blocks are parsed lazily from the file, translated
+        by a pool of workers while parsing continues, and each block is optimized and
+        formatted as soon as every earlier block is done. For every finished block a
+        'cue' progress message is sent with a tuple of its index, the original timing
+        and text, and the processed timing and text.
+
         Args:
             file_path (str): The path to the subtitle file.
             translate (bool): Whether to translate the subtitles.
@@ -50,37 +113,152 @@ class SubtitleService:
         Returns:
             str: The processed subtitle content as a single string.
         """
-        content = self._read_file(file_path)
-        
-        progress_callback('info', "Reading and parsing file...")
+        formatted_content = []
+        with open(file_path, "rb") as file:
+            self.process_stream(file, translate, target_language, progress_callback,
+                                formatted_content.append, os.path.getsize(file_path))
+        return ''.join(formatted_content)
+
+    def process_stream(self, stream: BinaryIO, translate: bool, target_language: Optional[str],
+                       progress_callback: Callable, output_callback: Callable[[str], None],
+                       total_size: Optional[int] = None) -> int:
+        """
+        Processes subtitles read from a binary stream, such as a member of an archive,
+        in the same way as `process_subtitles`. Each formatted block is handed to
+        `output_callback` as soon as it is ready and is not kept, so writing the output
+        to a file needs memory for the blocks in flight only.
+
+        Args:
+            stream (BinaryIO): The stream with the UTF-8 encoded subtitle content.
+            translate (bool): Whether to translate the subtitles.
+            target_language (Optional[str]): The target language for translation.
+            progress_callback (Callable): A function to call for progress updates.
+            output_callback (Callable[[str], None]): A function that receives each formatted
+                                                    block as soon as it is ready.
+            total_size (Optional[int]): The size of the content in bytes, if known, used
+                                        to report progress.
 
-        processed_content = self._clean_content(content)
-        subtitle_blocks = self._extract_blocks(processed_content, progress_callback)
-        
-        if not subtitle_blocks:
-             progress_callback('error', "Could not find any valid subtitle blocks in the file.")
-             return ""
-        
-        progress_callback('info', f"Total subtitles found: {len(subtitle_blocks)}")
+        Returns:
+            int: The number of blocks written to `output_callback`.
+        """
+        progress_callback('info', "Reading and parsing file...")
 
+        total_size = max(total_size or 0, 1)
+        blocks = self._iter_blocks(stream, progress_callback)
         if translate:
-            subtitle_blocks = self._translate_blocks(subtitle_blocks, target_language, progress_callback)
+            progress_callback('status', 'Translating subtitles...')
+            blocks = self._translate_stream(blocks, target_language, progress_callback)
+
+        written_blocks = 0
+        previous_block = None
+        total_blocks = 0
+        try:
+            for parsed in blocks:
+                total_blocks += 1
+                block = self._optimize_block(parsed.block, previous_block, written_blocks + 1)
+                if block is None:
+                    continue
+                previous_block = block
+                progress_callback('cue', (block[0], parsed.original_timing, parsed.original_text,
+                                          block[1], '\n'.join(block[2:])))
+
+                # Blocks are separated by a blank line and the output ends with a newline.
+                formatted_block = '\n'.join(block) + '\n'
+                if written_blocks:
+                    formatted_block = '\n' + formatted_block
+                output_callback(formatted_block)
+                written_blocks += 1
+                progress_callback('progress', min(parsed.offset / total_size, 1.0))
+        finally:
+            blocks.close()
+
+        if not total_blocks:
+            progress_callback('error', "Could not find any valid subtitle blocks in the file.")
+            return 0
+
+        progress_callback('info', f"Total subtitles found: {total_blocks}")
+        progress_callback('progress', 1.0)
+        return written_blocks
+
+    def estimate_translation(self, file_path: str, progress_callback: Callable) -> TranslationEstimate:
+        """
+        Parses a subtitle file without translating it and estimates how much translation
+        work it needs.
 
-        subtitle_blocks = self._optimize_blocks(subtitle_blocks, progress_callback)
-        return self._format_output(subtitle_blocks, progress_callback)
+        Args:
+            file_path (str): The path to the subtitle file.
+            progress_callback (Callable): A function to call for progress updates.
 
-    def _read_file(self, file_path: str) -> str:
+        Returns:
+            TranslationEstimate: The number of blocks, characters and requests, and the
+                                 estimated duration at the current request rate.
+        """
+        blocks = 0
+        characters = 0
+        requests = 0
+        total_size = max(os.path.getsize(file_path), 1)
+        with open(file_path, "rb") as file:
+            for parsed in self._iter_blocks(file, progress_callback):
+                blocks += 1
+                text = "\n".join(parsed.block[2:])
+                if text.strip():
+                    characters += len(text)
+                    requests += 1
+                progress_callback('progress', min(parsed.offset / total_size, 1.0))
+        estimated_seconds = self.translation_service.rate_controller.estimate_duration(requests)
+        return TranslationEstimate(blocks, characters, requests, estimated_seconds)
+
+    def _iter_blocks(self, stream: BinaryIO,
+                     progress_callback: Callable) -> Generator[_ParsedBlock, None, None]:
         """
-        Reads the content of a file.
+        Lazily reads, tokenizes and cleans subtitles from a binary stream.
+
+        The stream is decoded with universal newlines, so LF, CRLF and CR-only files are
+        all read the same way, and a UTF-8 byte order mark is dropped. The format is
+        detected from the first few kilobytes, and the matching format backend
+        tokenizes the file line by line in a single pass. Cue text is cleaned
+        in batches of `_CLEAN_BATCH_SIZE` cues so the spam patterns run over larger
+        spans of text at once.
 
         Args:
-            file_path (str): The path to the file.
+            stream (BinaryIO): The stream with the UTF-8 encoded subtitle content.
+            progress_callback (Callable): A function to call for progress updates.
 
-        Returns:
-            str: The content of the file.
+        Yields:
+            _ParsedBlock: Each subtitle block together with its original cue and the
+                          number of bytes of the stream consumed so far.
         """
-        with open(file_path, "r", encoding='UTF-8') as file:
-            return file.read()
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline=None)
+
+        def offset() -> int:
+            # Bytes read from the underlying stream; the wrapper reads ahead in chunks,
+            # which is precise enough for progress.
+            try:
+                return stream.tell()
+            except (OSError, ValueError):
+                return 0
+
+        try:
+            lines = (line.rstrip('\n') for line in text)
+            head: List[str] = []
+            head_size = 0
+            for line in lines:
+                head.append(line)
+                head_size += len(line)
+                if head_size >= _DETECTION_SAMPLE_SIZE:
+                    break
+            subtitle_format = detect_format('\n'.join(head))
+
+            batch: List[Cue] = []
+            for cue in subtitle_format.parse(chain(head, lines)):
+                batch.append(cue)
+                if len(batch) >= _CLEAN_BATCH_SIZE:
+                    yield from self._clean_cues(batch, offset())
+                    batch = []
+            yield from self._clean_cues(batch, offset())
+        finally:
+            # Leave the stream to its owner instead of closing it with the wrapper.
+            text.detach()
 
     def _clean_content(self, content: str) -> str:
         """
@@ -97,155 +275,205 @@ class SubtitleService:
             cleaned = re.sub(pattern, "", cleaned, flags=re.IGNORECASE)
         return cleaned
 
-    def _extract_blocks(self, content: str, progress_callback: Callable) -> List[List[str]]:
+    def _clean_cues(self, cues: List[Cue], offset: int) -> List[_ParsedBlock]:
         """
-        Extracts subtitle blocks from the content.
+        Cleans the text of a batch of cues and turns them into subtitle blocks.
 
         Args:
-            content (str): The subtitle content.
-            progress_callback (Callable): A function to call for progress updates.
+            cues (List[Cue]): The cues to clean.
+            offset (int): The number of bytes of the file consumed so far.
 
         Returns:
-            List[List[str]]: A list of subtitle blocks, where each block is a list of lines.
-        """
-        parsed_blocks = []
-        # First, remove the VTT header if it exists, so it doesn't interfere with parsing.
-        if content.strip().startswith('WEBVTT'):
-            content = re.sub(r'WEBVTT.*?\n\s*\n', '', content, 1, flags=re.DOTALL | re.IGNORECASE)
-
-        raw_blocks = re.split(r'\n\s*\n', content.strip())
-        
-        for raw_block in raw_blocks:
-            lines = [line.strip() for line in raw_block.split('\n') if line.strip()]
-            if not lines:
-                continue
-
-            # A valid block needs at least a timeline and a text line.
-            if len(lines) >= 2:
-                if lines[0].isdigit():
-                    parsed_blocks.append(lines)
-                # We assume that if it's not a digit, it's the timeline.
-                elif '-->' in lines[0] or ' - ' in lines[0]:
-                    new_block = [str(len(parsed_blocks) + 1)] + lines
-                    parsed_blocks.append(new_block)
-            
-        return parsed_blocks
-
-    def _translate_blocks(self, blocks: List[List[str]], target_language: str,
-                          progress_callback: Callable) -> List[List[str]]:
-        """
-        Translates the text in each subtitle block.
+            List[_ParsedBlock]: The subtitle blocks. Cues left without text are dropped.
+        """
+        texts = self._clean_content(_CUE_SEPARATOR.join('\n'.join(cue.lines) for cue in cues))
+        texts = texts.split(_CUE_SEPARATOR)
+        if len(texts) != len(cues):
+            # A pattern consumed a separator, so clean the cues one by one instead.
+            texts = [self._clean_content('\n'.join(cue.lines)) for cue in cues]
+
+        blocks = []
+        for cue, text in zip(cues, texts):
+            lines = [line.strip() for line in text.split('\n') if line.strip()]
+            if lines:
+                timing = f"{cue.start} --> {cue.end}"
+                blocks.append(_ParsedBlock([cue.identifier or '', timing] + lines, timing,
+                                           '\n'.join(cue.lines), offset))
+        return blocks
+
+    def _translate_stream(self, blocks: Generator[_ParsedBlock, None, None], target_language: str,
+                          progress_callback: Callable) -> Generator[_ParsedBlock, None, None]:
+        """
+        Translates subtitle blocks concurrently while they are still being parsed.
+
+        A producer thread pulls blocks from the parser into a bounded task queue, a pool
+        of workers translates them, and the results are yielded back in their original
+        order. At most `queue_size` blocks are in flight at any time, so a slow block
+        stalls the parser instead of growing memory. When the consumer stops early, the
+        workers are told to stop but requests already sent are not waited for.
 
         Args:
-            blocks (List[List[str]]): The list of subtitle blocks.
+            blocks (Generator[_ParsedBlock, None, None]): The parsed blocks.
             target_language (str): The target language for translation.
             progress_callback (Callable): A function to call for progress updates.
 
-        Returns:
-            List[List[str]]: The list of subtitle blocks with translated text.
+        Yields:
+            _ParsedBlock: The translated blocks, in their original order.
         """
-        translated_blocks = []
-        total_blocks = len(blocks)
-        progress_callback('status', 'Translating subtitles...')
-
-        for i, block in enumerate(blocks):
-            if len(block) < 3:
-                translated_blocks.append(block)
-                continue
-
-            original_text = "\n".join(block[2:])
-            if not original_text.strip():
-                translated_blocks.append(block)
-                continue
-
+        workers = max(1, self.translation_workers)
+        # Both queues are bounded by the slots, so putting into them never blocks and
+        # workers that outlive an early exit can always finish.
+        tasks: Queue = Queue()
+        results: Queue = Queue()
+        slots = Semaphore(self.queue_size)
+        stop = Event()
+        errors: List[Exception] = []
+
+        def produce():
             try:
-                translated_text = self.translation_service.translate_text(original_text, target_language)
-                translated_lines = translated_text.split("\n")
-                new_block = [block[0], block[1]] + translated_lines
-                translated_blocks.append(new_block)
-            except Exception as e:
-                error_message = f"Failed to translate block #{block[0]} (time: {block[1]}): {e}"
-                progress_callback('error', error_message)
-                raise RuntimeError(error_message)
-
-            progress = (i + 1) / total_blocks * 0.8
-            progress_callback('progress', progress)
-        return translated_blocks
-
-
-    def _optimize_blocks(self, blocks: List[List[str]], progress_callback: Callable) -> List[List[str]]:
+                for sequence, item in enumerate(blocks):
+                    while not slots.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if stop.is_set():
+                        return
+                    tasks.put((sequence, item))
+            except Exception as error:
+                errors.append(error)
+                stop.set()
+            finally:
+                for _ in range(workers):
+                    tasks.put(_END_OF_STREAM)
+
+        def translate():
+            try:
+                while True:
+                    task = tasks.get()
+                    if task is _END_OF_STREAM:
+                        break
+                    if stop.is_set():
+                        continue
+                    sequence, parsed = task
+                    try:
+                        block = self._translate_block(parsed.block, target_language, progress_callback)
+                    except Exception as error:
+                        errors.append(error)
+                        stop.set()
+                        continue
+                    results.put((sequence, parsed._replace(block=block)))
+            finally:
+                results.put(_END_OF_STREAM)
+
+        producer = Thread(target=produce, daemon=True)
+        translators = [Thread(target=translate, daemon=True) for _ in range(workers)]
+        for thread in [producer] + translators:
+            thread.start()
+
+        pending = {}
+        next_sequence = 0
+        finished_workers = 0
+        try:
+            while finished_workers < workers:
+                result = results.get()
+                if result is _END_OF_STREAM:
+                    finished_workers += 1
+                    continue
+                if stop.is_set():
+                    continue
+                sequence, parsed = result
+                pending[sequence] = parsed
+                while next_sequence in pending:
+                    yield pending.pop(next_sequence)
+                    slots.release()
+                    next_sequence += 1
+        finally:
+            # Stop the other stages. Workers still waiting for a response, e.g. when the
+            # processing is cancelled, finish on their own and their results are dropped.
+            stop.set()
+            producer.join()
+            if finished_workers == workers:
+                for thread in translators:
+                    thread.join()
+            blocks.close()
+
+        if errors:
+            raise errors[0]
+
+    def _translate_block(self, block: List[str], target_language: str,
+                         progress_callback: Callable) -> List[str]:
         """
-        Optimizes subtitle blocks by fixing timestamps and re-indexing.
+        Translates the text of a single subtitle block.
 
         Args:
-            blocks (List[List[str]]): The list of subtitle blocks.
+            block (List[str]): The subtitle block.
+            target_language (str): The target language for translation.
             progress_callback (Callable): A function to call for progress updates.
 
         Returns:
-            List[List[str]]: The optimized list of subtitle blocks.
-        """
-        optimized = []
-        current_index = 1
-
-        for i, block in enumerate(blocks):
-            if len(block) < 2:
-                continue
-            
-            # --- START OF CORRECTION ---
-            # We make the check more flexible to accept "-->" or "-".
-            timestamp_line = block[1]
-            if "-->" not in timestamp_line and "-" not in timestamp_line:
-                continue
-            # --- END OF CORRECTION ---
-
-            # Make sure the block has text before processing it.
-            if len(block) < 3:
-                continue
-                
-            block[0] = str(current_index)
-            
-            # Replace the non-standard separator with the standard SRT separator.
-            timestamp_line = re.sub(r'\s+-\s+', ' --> ', timestamp_line)
-            block[1] = timestamp_line
-
-            if optimized:
-                previous_block = optimized[-1]
-                if len(previous_block) > 1 and "-->" in previous_block[1]:
-                    previous_parts = previous_block[1].split('-->')
-                    previous_end_time = previous_parts[1].strip() if len(previous_parts) >= 2 else None
-                else:
-                    previous_end_time = None
-
-                if previous_end_time:
-                    current_parts = block[1].split('-->')
-                    current_start_time = current_parts[0].strip() if len(current_parts) >= 2 else None
-                    if current_start_time and previous_end_time != current_start_time:
-                        block[1] = f"{previous_end_time} --> {current_parts[1].strip()}"
-            
-            optimized.append(block)
-            current_index += 1
-
-        return optimized
-
-    def _format_output(self, blocks: List[List[str]], progress_callback: Callable) -> str:
-        """
-        Formats the final list of subtitle blocks into a single string.
+            List[str]: The subtitle block with translated text.
+
+        Raises:
+            RuntimeError: If the translation service fails.
+        """
+        if len(block) < 3:
+            return block
+
+        original_text = "\n".join(block[2:])
+        if not original_text.strip():
+            return block
+
+        try:
+            translated_text = self.translation_service.translate_text(original_text, target_language)
+        except Exception as e:
+            error_message = f"Failed to translate block #{block[0]} (time: {block[1]}): {e}"
+            progress_callback('error', error_message)
+            raise RuntimeError(error_message)
+        return [block[0], block[1]] + translated_text.split("\n")
+
+    def _optimize_block(self, block: List[str], previous_block: Optional[List[str]],
+                        index: int) -> Optional[List[str]]:
+        """
+        Optimizes a subtitle block by fixing its timestamp and re-indexing it.
 
         Args:
-            blocks (List[List[str]]): The list of subtitle blocks.
-            progress_callback (Callable): A function to call for progress updates.
+            block (List[str]): The subtitle block.
+            previous_block (Optional[List[str]]): The last block that was kept, if any.
+            index (int): The index to assign to the block.
 
         Returns:
-            str: The formatted subtitle content.
+            Optional[List[str]]: The optimized block, or None if it should be dropped.
         """
-        formatted_content = []
-        total_blocks = len(blocks)
-        if total_blocks == 0:
-            return ""
-            
-        for i, block in enumerate(blocks):
-            formatted_content.extend(block)
-            formatted_content.append('')
-            progress = 0.8 + (i + 1) / total_blocks * 0.2
-            progress_callback('progress', progress)
-        return '\n'.join(formatted_content)
+        if len(block) < 2:
+            return None
+
+        # --- START OF CORRECTION ---
+        # We make the check more flexible to accept "-->" or "-".
+        timestamp_line = block[1]
+        if "-->" not in timestamp_line and "-" not in timestamp_line:
+            return None
+        # --- END OF CORRECTION ---
+
+        # Make sure the block has text before processing it.
+        if len(block) < 3:
+            return None
+
+        block[0] = str(index)
+
+        # Replace the non-standard separator with the standard SRT separator.
+        timestamp_line = re.sub(r'\s+-\s+', ' --> ', timestamp_line)
+        block[1] = timestamp_line
+
+        if previous_block:
+            if len(previous_block) > 1 and "-->" in previous_block[1]:
+                previous_parts = previous_block[1].split('-->')
+                previous_end_time = previous_parts[1].strip() if len(previous_parts) >= 2 else None
+            else:
+                previous_end_time = None
+
+            if previous_end_time:
+                current_parts = block[1].split('-->')
+                current_start_time = current_parts[0].strip() if len(current_parts) >= 2 else None
+                if current_start_time and previous_end_time != current_start_time:
+                    block[1] = f"{previous_end_time} --> {current_parts[1].strip()}"
+
+        return block
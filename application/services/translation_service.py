@@ -2,18 +2,41 @@
 """
 This module provides a service for translating text using the deep-translator library.
 """
+import time
 from typing import Callable, Optional
+
 from deep_translator import GoogleTranslator
+from deep_translator.exceptions import RequestError, ServerException, TooManyRequests
+
+from .rate_controller import AdaptiveRateController
 
 
 class TranslationService:
     """
     A service class for handling text translation.
     """
+    def __init__(self, translate_function: Optional[Callable[[str, str], str]] = None,
+                 rate_controller: Optional[AdaptiveRateController] = None, max_retries: int = 5):
+        """
+        Initializes the TranslationService.
+
+        Args:
+            translate_function (Optional[Callable[[str, str], str]]): The backend that translates
+                                                                    a text to a target language.
+                                                                    Defaults to Google Translate.
+            rate_controller (Optional[AdaptiveRateController]): The controller that paces the
+                                                                requests to the backend.
+            max_retries (int): How many times a throttled or failed request is retried.
+        """
+        self.translate_function = translate_function or self._google_translate
+        self.rate_controller = rate_controller or AdaptiveRateController()
+        self.max_retries = max_retries
+
     def translate_text(self, text: str, target_language: str,
                        progress_callback: Optional[Callable] = None) -> str:
         """
-        Translates a given text to a target language using Google Translate.
+        Translates a given text to a target language. Requests are paced by the rate
+        controller, and throttled or transiently failed requests are retried.
 
         Args:
             text (str): The text to be translated.
@@ -24,10 +47,82 @@ class TranslationService:
         Returns:
             str: The translated text.
         """
-        translator = GoogleTranslator(source="auto", target=target_language)
-        translated_text = translator.translate(text)
+        attempt = 0
+        while True:
+            self.rate_controller.acquire()
+            outcome_recorded = False
+            started = time.monotonic()
+            try:
+                translated_text = self.translate_function(text, target_language)
+            except Exception as error:
+                if self._is_throttling(error):
+                    self.rate_controller.on_throttled()
+                elif self._is_transient(error):
+                    self.rate_controller.on_error()
+                else:
+                    self.rate_controller.release()
+                    outcome_recorded = True
+                    raise
+                outcome_recorded = True
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                continue
+            else:
+                self.rate_controller.on_success(time.monotonic() - started)
+                outcome_recorded = True
+                break
+            finally:
+                # Also free the slot when the request is interrupted, e.g. by SystemExit.
+                if not outcome_recorded:
+                    self.rate_controller.release()
 
         if progress_callback:
             progress_callback('translation', translated_text)
 
-        return translated_text
\ No newline at end of file
+        return translated_text
+
+    def _google_translate(self, text: str, target_language: str) -> str:
+        """
+        Translates a text using Google Translate.
+
+        Args:
+            text (str): The text to be translated.
+            target_language (str): The language code of the target language.
+
+        Returns:
+            str: The translated text.
+        """
+        translator = GoogleTranslator(source="auto", target=target_language)
+        return translator.translate(text)
+
+    def _is_throttling(self, error: Exception) -> bool:
+        """
+        Checks whether an error means the backend is rate limiting the requests.
+
+        Args:
+            error (Exception): The error raised by the backend.
+
+        Returns:
+            bool: True if the request was throttled, False otherwise.
+        """
+        if isinstance(error, TooManyRequests):
+            return True
+        # HTTP errors from other clients, such as urllib or requests.
+        status_code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+        return status_code == 429
+
+    def _is_transient(self, error: Exception) -> bool:
+        """
+        Checks whether an error is likely to go away when the request is retried.
+
+        Args:
+            error (Exception): The error raised by the backend.
+
+        Returns:
+            bool: True if the request should be retried, False otherwise.
+        """
+        status_code = getattr(error, 'code', None) or getattr(error, 'status_code', None)
+        if isinstance(status_code, int) and 400 <= status_code < 500:
+            return False
+        return isinstance(error, (RequestError, ServerException, OSError))
@@ -0,0 +1,412 @@
+# application/services/watch_service.py
+"""
+This module provides a service that watches a directory for new subtitle files and
+processes them automatically.
+"""
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import struct
+import sys
+import time
+from threading import Event, Lock, Semaphore, Thread, current_thread
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .file_service import FileService
+from .subtitle_formats import supported_extensions
+from .subtitle_service import SubtitleService
+
+# inotify event flags, from <sys/inotify.h>.
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_INOTIFY_EVENT = struct.Struct('iIII')
+
+# Name of the file in the output directory that remembers which contents were processed.
+_STATE_FILE_NAME = '.srt4u_watch_state.json'
+
+# The size and modification time of a file, used to notice that it is still being written.
+FileSignature = Tuple[int, int]
+
+
+class _WatchStopped(Exception):
+    """
+    Raised inside a file's processing to abandon it once the watch is stopped.
+    """
+
+
+class _InotifyMonitor:
+    """
+    Reports the names of files changed in a directory using Linux inotify.
+    """
+    def __init__(self, directory: str):
+        """
+        Initializes the monitor and starts watching the directory.
+
+        Args:
+            directory (str): The directory to watch.
+
+        Raises:
+            OSError: If inotify is not available.
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(error, f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout: float) -> Optional[List[str]]:
+        """
+        Waits for changes in the directory.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+
+        Returns:
+            Optional[List[str]]: The names of the changed files, or None if events were
+                                 lost and the whole directory must be scanned again.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        names = []
+        position = 0
+        while position + _INOTIFY_EVENT.size <= len(data):
+            _, mask, _, length = _INOTIFY_EVENT.unpack_from(data, position)
+            position += _INOTIFY_EVENT.size
+            name = data[position:position + length].rstrip(b'\0')
+            position += length
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        """
+        Stops watching the directory.
+        """
+        os.close(self._fd)
+
+
+class _PollingMonitor:
+    """
+    Fallback monitor for platforms without inotify; asks for a directory scan every time.
+    """
+    def wait(self, timeout: float) -> Optional[List[str]]:
+        time.sleep(timeout)
+        return None
+
+    def close(self):
+        pass
+
+
+class WatchService:
+    """
+    Watches a directory and feeds new subtitle files into the subtitle service on a
+    bounded pool of workers. Files are only picked up once they stopped changing for
+    `debounce_seconds`, and contents already processed with the same options are skipped.
+    """
+    def __init__(self, watch_directory: str, output_directory: str, translate: bool,
+                 target_language: Optional[str], output_format: str = 'srt',
+                 subtitle_service: Optional[SubtitleService] = None,
+                 file_service: Optional[FileService] = None, max_workers: int = 2,
+                 debounce_seconds: float = 2.0, poll_interval: float = 1.0,
+                 progress_callback: Optional[Callable] = None):
+        """
+        Initializes the WatchService.
+
+        Raises:
+            ValueError: If `max_workers` is less than 1.
+
+        Args:
+            watch_directory (str): The directory to watch for subtitle files.
+            output_directory (str): The directory to save processed files in.
+            translate (bool): Whether to translate the subtitles.
+            target_language (Optional[str]): The target language for translation.
+            output_format (str): The output format ('srt' or 'vtt').
+            subtitle_service (Optional[SubtitleService]): The service used to process files.
+            file_service (Optional[FileService]): The service used to save processed files.
+            max_workers (int): The maximum number of files processed at the same time.
+            debounce_seconds (float): How long a file must stay unchanged before it is processed.
+            poll_interval (float): How often the directory is scanned when inotify is not
+                                   available.
+            progress_callback (Optional[Callable]): A function to call with status messages.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.watch_directory = watch_directory
+        self.output_directory = output_directory
+        self.translate = translate
+        self.target_language = target_language if translate else None
+        self.output_format = output_format
+        self.subtitle_service = subtitle_service or SubtitleService()
+        self.file_service = file_service or FileService()
+        self.max_workers = max_workers
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+        self.progress_callback = progress_callback or (lambda msg_type, data: None)
+        self._extensions = tuple(supported_extensions())
+        self._state_path = os.path.join(output_directory, _STATE_FILE_NAME)
+        self._processed_hashes: Set[str] = self._load_state()
+        # Files waiting to settle, with their last seen signature and when it last changed.
+        self._pending: Dict[str, Tuple[FileSignature, float]] = {}
+        # Signatures of files already handled, so unchanged files are not hashed again.
+        self._seen: Dict[str, FileSignature] = {}
+        self._in_progress: Dict[str, FileSignature] = {}
+        # Daemon threads processing files, so a stopped watch never keeps the process alive.
+        self._workers: Set[Thread] = set()
+        self._lock = Lock()
+        self._slots = Semaphore(max_workers)
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self):
+        """
+        Starts watching in a background thread.
+        """
+        self._stop_event.clear()
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Asks the watcher to stop. Files that are already being processed are abandoned
+        at the next processed subtitle and files waiting to settle are dropped; use
+        `join` to wait for that.
+        """
+        self._stop_event.set()
+
+    def join(self, timeout: Optional[float] = None):
+        """
+        Waits for a watcher started with `start` to finish.
+
+        Args:
+            timeout (Optional[float]): The maximum number of seconds to wait.
+        """
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        """
+        Checks whether a watcher started with `start` is still running.
+
+        Returns:
+            bool: True until the watcher and the files it was processing have finished.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def run(self):
+        """
+        Watches the directory until `stop` is called. Files already in the directory are
+        picked up as well.
+        """
+        monitor = self._create_monitor()
+        self.progress_callback('info', f"Watching {self.watch_directory}")
+        try:
+            self._scan()
+            while not self._stop_event.is_set():
+                names = monitor.wait(self._next_timeout())
+                if names is None:
+                    self._scan()
+                else:
+                    for name in names:
+                        self._mark_changed(os.path.join(self.watch_directory, name))
+                self._dispatch_ready()
+        finally:
+            self._stop_event.set()
+            monitor.close()
+            self._pending.clear()
+            with self._lock:
+                workers = list(self._workers)
+            for worker in workers:
+                worker.join()
+            self.progress_callback('info', "Stopped watching")
+
+    def _create_monitor(self):
+        """
+        Creates an inotify monitor where available, or a polling monitor otherwise.
+        """
+        if sys.platform.startswith('linux'):
+            try:
+                return _InotifyMonitor(self.watch_directory)
+            except (OSError, AttributeError, TypeError):
+                pass
+        return _PollingMonitor()
+
+    def _next_timeout(self) -> float:
+        """
+        Computes how long to wait for events before pending files must be checked again.
+        """
+        if not self._pending:
+            return self.poll_interval
+        now = time.monotonic()
+        earliest = min(changed for _, changed in self._pending.values())
+        return min(self.poll_interval, max(0.05, earliest + self.debounce_seconds - now))
+
+    def _is_candidate(self, path: str) -> bool:
+        """
+        Checks whether a file should be processed, based on its name.
+        """
+        name = os.path.basename(path)
+        stem, extension = os.path.splitext(name)
+        # Skip hidden and temporary files and our own results if both directories are the same.
+        return (not name.startswith('.') and extension.lower() in self._extensions
+                and not stem.endswith('_processed'))
+
+    def _signature(self, path: str) -> Optional[FileSignature]:
+        """
+        Returns the size and modification time of a file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def _scan(self):
+        """
+        Checks every file in the watched directory for changes.
+        """
+        try:
+            entries = list(os.scandir(self.watch_directory))
+        except OSError as error:
+            self.progress_callback('info', f"Cannot read {self.watch_directory}: {error}")
+            return
+        for entry in entries:
+            if entry.is_file():
+                self._mark_changed(entry.path)
+
+    def _mark_changed(self, path: str):
+        """
+        Records a possible change to a file and restarts its debounce period if it did change.
+        """
+        if not self._is_candidate(path):
+            return
+        signature = self._signature(path)
+        if signature is None:
+            self._pending.pop(path, None)
+            return
+        with self._lock:
+            if signature in (self._seen.get(path), self._in_progress.get(path)):
+                return
+        pending = self._pending.get(path)
+        if pending is None or pending[0] != signature:
+            self._pending[path] = (signature, time.monotonic())
+
+    def _dispatch_ready(self):
+        """
+        Starts processing files that stopped changing while there are free worker slots.
+        """
+        now = time.monotonic()
+        for path, (signature, changed) in list(self._pending.items()):
+            if now - changed < self.debounce_seconds:
+                continue
+            current = self._signature(path)
+            if current is None:
+                del self._pending[path]
+                continue
+            if current != signature:
+                self._pending[path] = (current, now)
+                continue
+            with self._lock:
+                if path in self._in_progress:
+                    continue
+            if not self._slots.acquire(blocking=False):
+                break
+            del self._pending[path]
+            worker = Thread(target=self._process_file, args=(path, signature), daemon=True)
+            with self._lock:
+                self._in_progress[path] = signature
+                self._workers.add(worker)
+            worker.start()
+
+    def _process_file(self, path: str, signature: FileSignature):
+        """
+        Processes a single file unless its content was already processed with the same options.
+        """
+        name = os.path.basename(path)
+        try:
+            digest = self._hash_file(path)
+            with self._lock:
+                already_processed = digest in self._processed_hashes
+            if already_processed:
+                self.progress_callback('info', f"Skipped {name}: already processed with the same options")
+                return
+
+            self.progress_callback('info', f"Processing {name}...")
+            content = self.subtitle_service.process_subtitles(
+                path, self.translate, self.target_language, self._check_stopped)
+            if not content:
+                raise ValueError("Could not find any valid subtitle blocks in the file.")
+            output_path = self.file_service.save_processed_file(
+                path, self.output_directory, self.output_format, content)
+
+            with self._lock:
+                self._processed_hashes.add(digest)
+                self._save_state()
+            self.progress_callback('info', f"Processed {name}: saved to {output_path}")
+        except _WatchStopped:
+            self.progress_callback('info', f"Cancelled {name}")
+        except Exception as error:
+            self.progress_callback('info', f"Failed to process {name}: {error}")
+        finally:
+            with self._lock:
+                del self._in_progress[path]
+                self._seen[path] = signature
+                self._workers.discard(current_thread())
+            self._slots.release()
+
+    def _check_stopped(self, msg_type: str, data):
+        """
+        Progress callback for the subtitle service that abandons the file once the
+        watch is stopped.
+        """
+        if self._stop_event.is_set():
+            raise _WatchStopped()
+
+    def _hash_file(self, path: str) -> str:
+        """
+        Hashes the content of a file together with the processing options.
+        """
+        digest = hashlib.sha256()
+        options = [self.translate, self.target_language, self.output_format]
+        digest.update(json.dumps(options).encode('UTF-8'))
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _load_state(self) -> Set[str]:
+        """
+        Loads the hashes of already processed contents from the output directory.
+        """
+        try:
+            with open(self._state_path, 'r', encoding='UTF-8') as file:
+                return set(json.load(file).get('processed', []))
+        except (OSError, ValueError, AttributeError):
+            return set()
+
+    def _save_state(self):
+        """
+        Saves the hashes of processed contents to the output directory. Must be called
+        with the lock held.
+        """
+        temp_path = f"{self._state_path}.tmp"
+        with open(temp_path, 'w', encoding='UTF-8') as file:
+            json.dump({'processed': sorted(self._processed_hashes)}, file)
+        os.replace(temp_path, self._state_path)
@@ -0,0 +1,105 @@
+# benchmarks/bench_parsing.py
+"""
+Benchmarks the subtitle tokenizers per format and compares the SRT path with the
+regex-based parser they replaced.
+
+Usage:
+    python -m benchmarks.bench_parsing [number_of_cues]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Callable, List
+
+from application.services.subtitle_formats import get_format
+from application.services.subtitle_service import SubtitleService
+
+
+def _srt_time(milliseconds: int, separator: str = ',') -> str:
+    seconds, milliseconds = divmod(milliseconds, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{milliseconds:03d}"
+
+
+def generate(format_name: str, cues: int) -> str:
+    """
+    Generates a synthetic subtitle file with two lines of text per cue.
+    """
+    parts: List[str] = []
+    if format_name == 'vtt':
+        parts.append("WEBVTT\n\nNOTE generated\n\n")
+    elif format_name == 'ass':
+        parts.append("[Script Info]\nScriptType: v4.00+\n\n[Events]\n"
+                     "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text\n")
+    for i in range(cues):
+        start, end = i * 2000, i * 2000 + 1500
+        if format_name == 'srt':
+            parts.append(f"{i + 1}\n{_srt_time(start)} --> {_srt_time(end)}\nLine {i} of the text\nSecond line\n\n")
+        elif format_name == 'vtt':
+            parts.append(f"{_srt_time(start, '.')} --> {_srt_time(end, '.')} align:start\n"
+                         f"Line {i} of the text\nSecond line\n\n")
+        elif format_name == 'ass':
+            parts.append(f"Dialogue: 0,{_srt_time(start, '.')[1:-1]},{_srt_time(end, '.')[1:-1]},Default,,0,0,0,,"
+                         f"{{\\i1}}Line {i} of the text{{\\i0}}\\NSecond line\n")
+        elif format_name == 'sbv':
+            parts.append(f"{_srt_time(start, '.')[1:]},{_srt_time(end, '.')[1:]}\nLine {i} of the text\nSecond line\n\n")
+    return ''.join(parts)
+
+
+def legacy_extract_blocks(content: str) -> List[List[str]]:
+    """
+    The regex-based block extraction used before the format tokenizers.
+    """
+    parsed_blocks = []
+    if content.strip().startswith('WEBVTT'):
+        content = re.sub(r'WEBVTT.*?\n\s*\n', '', content, 1, flags=re.DOTALL | re.IGNORECASE)
+    for raw_block in re.split(r'\n\s*\n', content.strip()):
+        lines = [line.strip() for line in raw_block.split('\n') if line.strip()]
+        if len(lines) >= 2:
+            if lines[0].isdigit():
+                parsed_blocks.append(lines)
+            elif '-->' in lines[0] or ' - ' in lines[0]:
+                parsed_blocks.append([str(len(parsed_blocks) + 1)] + lines)
+    return parsed_blocks
+
+
+def measure(function: Callable[[], int], size: int, label: str, repeats: int = 3):
+    best = float('inf')
+    count = 0
+    for _ in range(repeats):
+        started = time.perf_counter()
+        count = function()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<28} {count:>8} cues {best * 1000:>9.1f} ms {size / best / 1e6:>8.1f} MB/s")
+
+
+def main():
+    cues = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    service = SubtitleService()
+    with tempfile.TemporaryDirectory() as directory:
+        for format_name in ('srt', 'vtt', 'ass', 'sbv'):
+            content = generate(format_name, cues)
+            size = len(content.encode('UTF-8'))
+            path = os.path.join(directory, f"bench.{format_name}")
+            with open(path, 'w', encoding='UTF-8') as file:
+                file.write(content)
+
+            subtitle_format = get_format(format_name)
+            measure(lambda: sum(1 for _ in subtitle_format.parse(content.split('\n'))),
+                    size, f"{format_name} tokenizer")
+            def read_parse_clean():
+                with open(path, 'rb') as stream:
+                    return sum(1 for _ in service._iter_blocks(stream, lambda t, d: None))
+            measure(read_parse_clean, size, f"{format_name} read+parse+clean")
+            if format_name in ('srt', 'vtt'):
+                def legacy():
+                    with open(path, 'r', encoding='UTF-8') as file:
+                        return len(legacy_extract_blocks(service._clean_content(file.read())))
+                measure(legacy, size, f"{format_name} legacy read+parse+clean")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,109 @@
 # main.py
 """
 This script is the main entry point for the SRT4U Subtitle Processor application.
-It initializes the PyQt6 application and displays the main GUI.
+By default it initializes the PyQt6 application and displays the main GUI. With
+--watch it runs headless and processes new subtitle files dropped into a directory,
+and with --estimate it prints how much translation work a subtitle file needs.
 """
+import argparse
+import os
 import sys
-from PyQt6.QtWidgets import QApplication
-from application.gui import SubtitleProcessorGUI
+import time
 
-if __name__ == '__main__':
+
+def run_gui(argv):
     """
-    Main execution block.
     Initializes the QApplication, creates an instance of the SubtitleProcessorGUI,
     shows the GUI, and starts the application's event loop.
     """
-    app = QApplication(sys.argv)
+    from PyQt6.QtWidgets import QApplication
+    from application.gui import SubtitleProcessorGUI
+
+    app = QApplication(argv)
     processor = SubtitleProcessorGUI()
     processor.show()
-    sys.exit(app.exec())
\ No newline at end of file
+    return app.exec()
+
+
+def run_estimate(args):
+    """
+    Parses a subtitle file without translating it and prints how many subtitles,
+    characters and requests a translated run needs and how long it is expected to take.
+    """
+    from application.services.subtitle_service import SubtitleService
+
+    try:
+        estimate = SubtitleService().estimate_translation(args.estimate, lambda msg_type, data: None)
+    except (OSError, ValueError) as error:
+        print(f"Cannot estimate {args.estimate}: {error}", file=sys.stderr)
+        return 1
+    print(estimate.summary())
+    return 0
+
+
+def run_watch(args):
+    """
+    Watches a directory without a GUI and prints a line for every processed file,
+    until interrupted with Ctrl+C. Returns a non-zero exit code if the watcher stops
+    on its own, e.g. because of an error.
+    """
+    from application.services.watch_service import WatchService
+
+    watcher = WatchService(
+        args.watch,
+        args.output or args.watch,
+        bool(args.translate),
+        args.translate,
+        args.format,
+        max_workers=args.workers,
+        debounce_seconds=args.debounce,
+        progress_callback=lambda msg_type, data: print(data, flush=True)
+    )
+    watcher.start()
+    try:
+        # Sleep instead of joining: a join interrupted by Ctrl+C breaks later joins.
+        while watcher.is_alive():
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        watcher.stop()
+        watcher.join(5.0)
+        return 0
+    print("Watching stopped unexpectedly", file=sys.stderr)
+    return 1
+
+
+if __name__ == '__main__':
+    """
+    Main execution block.
+    Parses the command line and starts the GUI, the headless watch mode, or a dry run.
+    """
+    parser = argparse.ArgumentParser(description='SRT4U - Subtitle Processor')
+    parser.add_argument('--watch', metavar='DIRECTORY',
+                        help='watch a directory and process new subtitle files without the GUI')
+    parser.add_argument('--estimate', metavar='FILE',
+                        help='print the translation work a subtitle file needs without processing it')
+    parser.add_argument('--output', metavar='DIRECTORY',
+                        help='directory for processed files (defaults to the watched directory)')
+    parser.add_argument('--translate', metavar='LANGUAGE',
+                        help='translate subtitles to this language code (e.g. es)')
+    parser.add_argument('--format', choices=['srt', 'vtt'], default='srt', help='output format')
+    parser.add_argument('--workers', type=int, default=2, help='files processed at the same time')
+    parser.add_argument('--debounce', type=float, default=2.0,
+                        help='seconds a file must stay unchanged before it is processed')
+    args, qt_args = parser.parse_known_args()
+
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            parser.error(f"--watch: not a directory: {args.watch}")
+        if args.output and not os.path.isdir(args.output):
+            parser.error(f"--output: not a directory: {args.output}")
+        if args.workers < 1:
+            parser.error("--workers must be at least 1")
+        if args.debounce < 0:
+            parser.error("--debounce must not be negative")
+
+    if args.estimate:
+        sys.exit(run_estimate(args))
+    if args.watch:
+        sys.exit(run_watch(args))
+    sys.exit(run_gui(sys.argv[:1] + qt_args))
@@ -0,0 +1,63 @@
+# tests/test_archive_service.py
+"""
+Tests for the ArchiveService: members of zip and tar archives are processed and written
+into an output archive of the same type under distinct names.
+"""
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+from typing import List, Tuple
+
+from application.services.archive_service import ArchiveService
+
+SRT = b"1\n00:00:01,000 --> 00:00:02,000\nHello\n"
+VTT = b"WEBVTT\n\n00:01.000 --> 00:02.000\nHello\n"
+MEMBERS = [('ep1.srt', SRT), ('ep1.vtt', VTT), ('ep1.SRT', SRT), ('season/ep1.vtt', VTT),
+           ('notes.srt', b"nothing to see here\n")]
+OUTPUT_NAMES = ['ep1.srt', 'ep1.vtt.srt', 'ep1.SRT.srt', 'season/ep1.srt']
+
+
+class ArchiveServiceTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def process(self, archive_name: str) -> Tuple[str, List[Tuple[str, str]]]:
+        result = ArchiveService(max_workers=2).process_archive(
+            os.path.join(self.directory.name, archive_name), self.directory.name, False, None, 'srt',
+            lambda msg_type, data: None)
+        self.assertEqual(result.processed, len(OUTPUT_NAMES))
+        return result.output_path, result.skipped
+
+    def test_zip_members_get_distinct_names(self):
+        with zipfile.ZipFile(os.path.join(self.directory.name, 'pack.zip'), 'w') as archive:
+            for name, data in MEMBERS:
+                archive.writestr(name, data)
+
+        output_path, skipped = self.process('pack.zip')
+
+        with zipfile.ZipFile(output_path) as archive:
+            self.assertEqual(archive.namelist(), OUTPUT_NAMES)
+            self.assertEqual(archive.read('ep1.vtt.srt').decode('UTF-8'),
+                             "1\n00:01.000 --> 00:02.000\nHello\n")
+        self.assertEqual([name for name, _ in skipped], ['notes.srt'])
+
+    def test_tar_members_get_distinct_names(self):
+        with tarfile.open(os.path.join(self.directory.name, 'pack.tar.gz'), 'w:gz') as archive:
+            for name, data in MEMBERS:
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                archive.addfile(info, io.BytesIO(data))
+
+        output_path, skipped = self.process('pack.tar.gz')
+
+        with tarfile.open(output_path) as archive:
+            self.assertEqual(archive.getnames(), OUTPUT_NAMES)
+        self.assertEqual([name for name, _ in skipped], ['notes.srt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+# tests/test_process_worker.py
+"""
+Tests for the ProcessWorker, running real jobs and watches in a worker process.
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from application.services.process_worker import (_CANCEL_TIMEOUT, ProcessingJob, ProcessWorker,
+                                                  WatchJob)
+
+
+class ProcessWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.input_path = os.path.join(self.directory.name, 'episode.srt')
+        with open(self.input_path, 'w', encoding='UTF-8') as file:
+            for index in range(200000):
+                file.write(f"{index + 1}\n00:00:01,000 --> 00:00:02,000\nline {index}\n\n")
+        self.output_directory = os.path.join(self.directory.name, 'output')
+        os.mkdir(self.output_directory)
+
+    def test_job_saves_its_output(self):
+        worker = ProcessWorker()
+        worker.start(ProcessingJob(self.input_path, self.output_directory, False, None, 'srt',
+                                   preview_limit=0))
+        messages = []
+        deadline = time.monotonic() + 60
+        while worker.is_running and time.monotonic() < deadline:
+            messages.extend(worker.receive())
+            time.sleep(0.01)
+
+        self.assertEqual(messages[-1], ('saved', os.path.join(self.output_directory,
+                                                              'episode_processed.srt')))
+        self.assertEqual(os.listdir(self.output_directory), ['episode_processed.srt'])
+
+    def test_cancelled_job_stops_without_being_terminated(self):
+        worker = ProcessWorker()
+        worker.start(ProcessingJob(self.input_path, self.output_directory, False, None, 'srt',
+                                   preview_limit=0))
+        deadline = time.monotonic() + 30
+        while ('progress' not in [msg_type for msg_type, _ in worker.receive()]
+               and time.monotonic() < deadline):
+            time.sleep(0.01)
+        process = worker._process
+
+        started = time.monotonic()
+        worker.cancel()
+        process.join(_CANCEL_TIMEOUT + 5)
+
+        self.assertFalse(worker.is_running)
+        self.assertLess(time.monotonic() - started, _CANCEL_TIMEOUT)
+        self.assertEqual(process.exitcode, 1)
+        self.assertEqual(os.listdir(self.output_directory), [])
+
+    def test_watch_processes_files_until_stopped(self):
+        watch_directory = os.path.join(self.directory.name, 'incoming')
+        os.mkdir(watch_directory)
+        with open(os.path.join(watch_directory, 'short.srt'), 'w', encoding='UTF-8') as file:
+            file.write("1\n00:00:01,000 --> 00:00:02,000\nHello\n")
+        worker = ProcessWorker()
+        worker.start_watch(WatchJob(watch_directory, self.output_directory, False, None, 'srt'))
+        messages = []
+        deadline = time.monotonic() + 30
+        while (not any(data and str(data).startswith('Processed') for _, data in messages)
+               and time.monotonic() < deadline):
+            messages.extend(worker.receive())
+            time.sleep(0.05)
+
+        worker.stop()
+        deadline = time.monotonic() + 30
+        while worker.is_running and time.monotonic() < deadline:
+            messages.extend(worker.receive())
+            time.sleep(0.05)
+
+        self.assertIn('short_processed.srt', os.listdir(self.output_directory))
+        self.assertEqual(messages[-2:], [('info', "Stopped watching"), ('stopped', None)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+# tests/test_rate_controller.py
+"""
+Tests for the adaptive rate controller, driven through the TranslationService against
+the local stand-in translation server. The controller and the server share a fake
+clock, so waiting between requests takes no real time and the results are deterministic.
+"""
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+
+from application.services.rate_controller import AdaptiveRateController
+from application.services.translation_service import TranslationService
+from tests.translation_standin import StandinTranslationServer
+
+
+class FakeClock:
+    """
+    A clock that only advances when something sleeps on it.
+    """
+    def __init__(self):
+        self.now = 0.0
+        self._lock = threading.Lock()
+
+    def __call__(self) -> float:
+        with self._lock:
+            return self.now
+
+    def sleep(self, seconds: float):
+        with self._lock:
+            self.now += max(seconds, 0.0)
+
+
+class AdaptiveRateControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def create_service(self, server: StandinTranslationServer, max_retries: int = 5,
+                       **controller_options) -> TranslationService:
+        controller = AdaptiveRateController(clock=self.clock, sleep=self.clock.sleep,
+                                            **controller_options)
+        return TranslationService(translate_function=server.translate, rate_controller=controller,
+                                  max_retries=max_retries)
+
+    def test_limits_rise_on_success(self):
+        with StandinTranslationServer(1000, clock=self.clock) as server:
+            service = self.create_service(server, initial_concurrency=2, initial_rate=5.0)
+            for index in range(20):
+                self.assertEqual(service.translate_text(f"line {index}", 'es'), f"LINE {index}")
+
+        controller = service.rate_controller
+        self.assertGreater(controller.concurrency, 2)
+        self.assertGreater(controller.rate, 5.0)
+        self.assertEqual(controller.success_count, 20)
+        self.assertEqual(controller.throttled_count, 0)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_limits_drop_on_throttling(self):
+        with StandinTranslationServer(10, clock=self.clock) as server:
+            service = self.create_service(server, max_retries=10, initial_concurrency=4,
+                                          initial_rate=50.0, max_rate=100.0)
+            controller = service.rate_controller
+            # Record the limits around every 429, before later successes raise them again.
+            limits = []
+            on_throttled = controller.on_throttled
+
+            def record_throttled():
+                before = (controller.concurrency, controller.rate)
+                on_throttled()
+                limits.append((before, (controller.concurrency, controller.rate)))
+
+            controller.on_throttled = record_throttled
+            results = [service.translate_text(f"line {index}", 'es') for index in range(30)]
+
+        self.assertEqual(results, [f"LINE {index}" for index in range(30)])
+        self.assertGreater(server.throttled_count, 0)
+        self.assertEqual(controller.throttled_count, server.throttled_count)
+        (concurrency_before, rate_before), (concurrency_after, rate_after) = limits[0]
+        self.assertAlmostEqual(concurrency_after, concurrency_before * 0.5)
+        self.assertAlmostEqual(rate_after, rate_before * 0.5)
+        self.assertLess(min(after[1] for _, after in limits), server.requests_per_second)
+        self.assertLess(controller.rate, 50.0)
+        self.assertEqual(controller.in_flight, 0)
+
+    def test_retries_stop_after_max_retries(self):
+        with StandinTranslationServer(0, clock=self.clock) as server:
+            service = self.create_service(server, max_retries=3)
+            with self.assertRaises(HTTPError) as context:
+                service.translate_text("line", 'es')
+
+        self.assertEqual(context.exception.code, 429)
+        self.assertEqual(server.throttled_count, 4)
+        self.assertEqual(service.rate_controller.throttled_count, 4)
+        self.assertEqual(service.rate_controller.in_flight, 0)
+
+    def test_concurrent_requests_release_their_slots(self):
+        with StandinTranslationServer(20, clock=self.clock) as server:
+            service = self.create_service(server, max_retries=20, initial_concurrency=4,
+                                          initial_rate=40.0)
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda index: service.translate_text(f"line {index}", 'es'),
+                                            range(40)))
+
+        self.assertEqual(results, [f"LINE {index}" for index in range(40)])
+        self.assertEqual(service.rate_controller.in_flight, 0)
+
+    def test_interrupted_request_releases_its_slot(self):
+        def interrupted(text: str, target_language: str) -> str:
+            raise SystemExit(1)
+
+        controller = AdaptiveRateController(initial_concurrency=1, clock=self.clock,
+                                            sleep=self.clock.sleep)
+        service = TranslationService(translate_function=interrupted, rate_controller=controller)
+        for _ in range(3):
+            with self.assertRaises(SystemExit):
+                service.translate_text("line", 'es')
+
+        self.assertEqual(controller.in_flight, 0)
+        self.assertEqual(controller.success_count + controller.error_count, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+# tests/test_subtitle_formats.py
+"""
+Tests for the subtitle format backends: one case per format and per recovery rule of
+the tokenizers, and the precedence of format detection.
+"""
+import unittest
+from typing import List
+
+from application.services.subtitle_formats import (AssFormat, Cue, SbvFormat, SrtFormat,
+                                                   SubtitleFormat, VttFormat, detect_format)
+
+
+def parse(subtitle_format: SubtitleFormat, content: str) -> List[Cue]:
+    return list(subtitle_format.parse(content.split('\n')))
+
+
+class SrtFormatTest(unittest.TestCase):
+    def test_cues_keep_index_and_timing(self):
+        cues = parse(SrtFormat(), "1\n00:00:01,000 --> 00:00:02,000\nHello\nthere\n\n"
+                                  "2\n00:00:03,000 --> 00:00:04,000\nBye\n")
+
+        self.assertEqual(cues, [Cue('00:00:01,000', '00:00:02,000', ['Hello', 'there'], '1'),
+                                Cue('00:00:03,000', '00:00:04,000', ['Bye'], '2')])
+
+    def test_missing_index_and_dash_separator(self):
+        cues = parse(SrtFormat(), "00:00:01,000 - 00:00:02,000\nHello\n")
+
+        self.assertEqual(cues, [Cue('00:00:01,000', '00:00:02,000', ['Hello'])])
+
+    def test_missing_blank_line_between_cues(self):
+        cues = parse(SrtFormat(), "1\n00:00:01,000 --> 00:00:02,000\nHello\n"
+                                  "2\n00:00:03,000 --> 00:00:04,000\nBye\n")
+
+        self.assertEqual(cues, [Cue('00:00:01,000', '00:00:02,000', ['Hello'], '1'),
+                                Cue('00:00:03,000', '00:00:04,000', ['Bye'], '2')])
+
+    def test_block_without_timing_is_skipped(self):
+        cues = parse(SrtFormat(), "1\nnot a timing line\nHello\n\n"
+                                  "2\n00:00:03,000 --> 00:00:04,000\nBye\n")
+
+        self.assertEqual(cues, [Cue('00:00:03,000', '00:00:04,000', ['Bye'], '2')])
+
+
+class VttFormatTest(unittest.TestCase):
+    def test_header_and_metadata_blocks_are_skipped(self):
+        cues = parse(VttFormat(), "WEBVTT - Title\nKind: captions\n\n"
+                                  "NOTE a comment\nspanning lines\n\n"
+                                  "STYLE\n::cue { color: red }\n\n"
+                                  "REGION\nid:top\n\n"
+                                  "00:01.000 --> 00:02.000\nHello\n")
+
+        self.assertEqual(cues, [Cue('00:01.000', '00:02.000', ['Hello'])])
+
+    def test_identifier_and_settings_are_kept(self):
+        cues = parse(VttFormat(), "WEBVTT\n\nintro\n00:01.000 --> 00:02.000 align:start line:0\n"
+                                  "Hello\n")
+
+        self.assertEqual(cues, [Cue('00:01.000', '00:02.000', ['Hello'], 'intro',
+                                    'align:start line:0')])
+
+    def test_cue_directly_after_header(self):
+        cues = parse(VttFormat(), "WEBVTT\n00:01.000 --> 00:02.000\nHello\n\n"
+                                  "00:03.000 --> 00:04.000\nBye\n")
+
+        self.assertEqual(cues, [Cue('00:01.000', '00:02.000', ['Hello']),
+                                Cue('00:03.000', '00:04.000', ['Bye'])])
+
+    def test_missing_blank_line_between_cues(self):
+        cues = parse(VttFormat(), "WEBVTT\n\n00:01.000 --> 00:02.000\nHello\n"
+                                  "00:03.000 --> 00:04.000\nBye\n")
+
+        self.assertEqual(cues, [Cue('00:01.000', '00:02.000', ['Hello']),
+                                Cue('00:03.000', '00:04.000', ['Bye'])])
+
+
+class AssFormatTest(unittest.TestCase):
+    def test_format_line_maps_fields_and_text_keeps_commas(self):
+        cues = parse(AssFormat(), "[Script Info]\nTitle: Example\n\n"
+                                  "[V4+ Styles]\nFormat: Name, Fontname\nStyle: Default,Arial\n\n"
+                                  "[Events]\n"
+                                  "Format: Start, End, Style, Text\n"
+                                  "Comment: 0:00:00.00,0:00:01.00,Default,ignored\n"
+                                  "Dialogue: 0:00:01.50,0:00:03.00,Default,"
+                                  "{\\i1}Well, hello{\\i0}\\Nthere, you\n")
+
+        self.assertEqual(cues, [Cue('00:00:01,500', '00:00:03,000', ['Well, hello', 'there, you'],
+                                    None, 'Default')])
+
+    def test_default_fields_without_format_line(self):
+        cues = parse(AssFormat(), "[Events]\n"
+                                  "Dialogue: 0,0:00:01.00,0:00:02.00,Default,,0,0,0,,Hi, all\n")
+
+        self.assertEqual(cues, [Cue('00:00:01,000', '00:00:02,000', ['Hi, all'], None, 'Default')])
+
+
+class SbvFormatTest(unittest.TestCase):
+    def test_timing_is_converted_to_srt_notation(self):
+        cues = parse(SbvFormat(), "0:00:01.000,0:00:02.500\nHello\nthere\n\n"
+                                  "0:01:03.100,0:01:04.000\nBye\n")
+
+        self.assertEqual(cues, [Cue('00:00:01,000', '00:00:02,500', ['Hello', 'there']),
+                                Cue('00:01:03,100', '00:01:04,000', ['Bye'])])
+
+
+class DetectFormatTest(unittest.TestCase):
+    def test_each_format_is_detected(self):
+        samples = {
+            'vtt': "WEBVTT\n\n00:01.000 --> 00:02.000\nHello\n",
+            'ass': "[Script Info]\nTitle: Example\n",
+            'sbv': "0:00:01.000,0:00:02.000\nHello\n",
+            'srt': "1\n00:00:01,000 --> 00:00:02,000\nHello\n",
+        }
+        for name, sample in samples.items():
+            with self.subTest(name):
+                self.assertEqual(detect_format(sample).name, name)
+
+    def test_vtt_signature_wins_over_ass_sections(self):
+        self.assertEqual(detect_format("WEBVTT\n\nNOTE\n[Events]\n").name, 'vtt')
+
+    def test_ass_section_name_inside_srt_text_is_not_a_signature(self):
+        sample = "1\n00:00:01,000 --> 00:00:02,000\nSee the [Events] tab and [Script Info]\n"
+
+        self.assertEqual(detect_format(sample).name, 'srt')
+
+    def test_base_class_cannot_be_instantiated(self):
+        with self.assertRaises(TypeError):
+            SubtitleFormat()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# tests/test_subtitle_pipeline.py
+"""
+Tests for the translation pipeline of the SubtitleService. Translations are done by a
+local function with random delays, so blocks finish out of order.
+"""
+import io
+import random
+import threading
+import time
+import unittest
+from typing import Generator, List
+
+from application.services.rate_controller import AdaptiveRateController
+from application.services.subtitle_service import SubtitleService, _ParsedBlock
+from application.services.translation_service import TranslationService
+
+
+def make_srt(count: int) -> bytes:
+    cues = []
+    for index in range(count):
+        start, end = index * 2, index * 2 + 1
+        cues.append(f"{index + 1}\n00:00:{start // 60:02d}:{start % 60:02d},000 --> "
+                    f"00:00:{end // 60:02d}:{end % 60:02d},000\nline {index}\n")
+    return '\n'.join(cues).encode('UTF-8')
+
+
+def slow_upper(text: str, target_language: str) -> str:
+    time.sleep(random.uniform(0, 0.005))
+    return text.upper()
+
+
+class SubtitlePipelineTest(unittest.TestCase):
+    def create_service(self, translate_function=slow_upper, translation_workers: int = 8,
+                       queue_size: int = 64) -> SubtitleService:
+        service = SubtitleService(translation_workers=translation_workers, queue_size=queue_size)
+        controller = AdaptiveRateController(initial_concurrency=8, max_concurrency=8,
+                                            initial_rate=10000.0, max_rate=10000.0)
+        service.translation_service = TranslationService(translate_function=translate_function,
+                                                         rate_controller=controller)
+        return service
+
+    def process(self, service: SubtitleService, content: bytes, translate: bool = True) -> str:
+        output: List[str] = []
+        service.process_stream(io.BytesIO(content), translate, 'es', lambda msg_type, data: None,
+                               output.append, len(content))
+        return ''.join(output)
+
+    def parsed_blocks(self, count: int, produced: List[int]) -> Generator[_ParsedBlock, None, None]:
+        for index in range(count):
+            produced[0] += 1
+            yield _ParsedBlock([str(index + 1), '00:00:01,000 --> 00:00:02,000', f"line {index}"],
+                               '00:00:01,000 --> 00:00:02,000', f"line {index}", index)
+
+    def test_output_keeps_order_under_out_of_order_translation(self):
+        random.seed(1)
+        content = make_srt(300)
+        service = self.create_service()
+        translated = self.process(service, content)
+
+        self.assertEqual(translated, self.process(service, content, translate=False).upper())
+        self.assertEqual(service.translation_service.rate_controller.in_flight, 0)
+
+    def test_blocks_in_flight_are_bounded_by_queue_size(self):
+        service = self.create_service(translation_workers=4, queue_size=5)
+        produced = [0]
+        consumed = 0
+        most_in_flight = 0
+        for parsed in service._translate_stream(self.parsed_blocks(100, produced), 'es',
+                                                lambda msg_type, data: None):
+            self.assertEqual(parsed.block[2], f"LINE {consumed}")
+            consumed += 1
+            time.sleep(0.002)
+            most_in_flight = max(most_in_flight, produced[0] - consumed)
+
+        self.assertEqual(consumed, 100)
+        # The producer holds one more block while it waits for a free slot.
+        self.assertLessEqual(most_in_flight, 5 + 1)
+
+    def test_worker_error_is_raised_to_the_caller(self):
+        def failing(text: str, target_language: str) -> str:
+            if text == 'line 40':
+                raise ValueError("bad input")
+            return slow_upper(text, target_language)
+
+        service = self.create_service(failing)
+        with self.assertRaises(RuntimeError) as context:
+            self.process(service, make_srt(100))
+
+        self.assertIn("bad input", str(context.exception))
+        self.assertEqual(service.translation_service.rate_controller.in_flight, 0)
+
+    def test_early_close_does_not_wait_for_pending_requests(self):
+        release = threading.Event()
+
+        def blocking(text: str, target_language: str) -> str:
+            if text != 'line 0':
+                release.wait(10)
+            return text.upper()
+
+        service = self.create_service(blocking, translation_workers=4, queue_size=8)
+        produced = [0]
+        stream = service._translate_stream(self.parsed_blocks(50, produced), 'es',
+                                           lambda msg_type, data: None)
+        self.assertEqual(next(stream).block[2], 'LINE 0')
+
+        started = time.monotonic()
+        closer = threading.Thread(target=stream.close)
+        closer.start()
+        closer.join(2.0)
+        self.assertFalse(closer.is_alive())
+        self.assertLess(time.monotonic() - started, 2.0)
+        self.assertLessEqual(produced[0], 8 + 2)
+
+        # Requests that were already sent finish on their own and free their slots.
+        release.set()
+        controller = service.translation_service.rate_controller
+        deadline = time.monotonic() + 5
+        while controller.in_flight and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(controller.in_flight, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
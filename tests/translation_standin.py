@@ -0,0 +1,144 @@
+# tests/translation_standin.py
+"""
+A local stand-in for the translation backend. It answers like a translation API but
+rejects requests with HTTP 429 once more than a given number of them arrive within one
+second, so the rate controller can be exercised without touching a real service.
+
+Run `python -m tests.translation_standin [requests_per_second]` to start it on its own.
+"""
+import json
+import threading
+import time
+import urllib.request
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque
+
+
+class StandinTranslationServer:
+    """
+    An HTTP server that "translates" texts by upper-casing them and simulates a rate limit.
+    """
+    def __init__(self, requests_per_second: int, clock: Callable[[], float] = time.monotonic,
+                 latency: float = 0.0):
+        """
+        Initializes the StandinTranslationServer.
+
+        Args:
+            requests_per_second (int): The number of requests accepted within any one second;
+                                       further requests are rejected with HTTP 429.
+            clock (Callable[[], float]): The clock used to measure the one-second window.
+            latency (float): How many seconds each accepted request takes.
+        """
+        self.requests_per_second = requests_per_second
+        self.latency = latency
+        self.accepted_count = 0
+        self.throttled_count = 0
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._accepted_times: Deque[float] = deque()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._create_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        str: The address the server listens on.
+        """
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    def start(self):
+        """
+        Starts serving requests in a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the server and closes its socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StandinTranslationServer':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def translate(self, text: str, target_language: str) -> str:
+        """
+        A `translate_function` for the TranslationService that sends the text to this server.
+        A rejected request raises urllib's HTTPError with code 429.
+
+        Args:
+            text (str): The text to be translated.
+            target_language (str): The language code of the target language.
+
+        Returns:
+            str: The translated text.
+        """
+        body = json.dumps({'text': text, 'target': target_language}).encode('UTF-8')
+        request = urllib.request.Request(self.url, data=body, method='POST',
+                                         headers={'Content-Type': 'application/json'})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.read().decode('UTF-8')
+
+    def _accept(self) -> bool:
+        """
+        Records a request and decides whether it is within the rate limit.
+        """
+        with self._lock:
+            now = self._clock()
+            while self._accepted_times and now - self._accepted_times[0] >= 1.0:
+                self._accepted_times.popleft()
+            if len(self._accepted_times) >= self.requests_per_second:
+                self.throttled_count += 1
+                return False
+            self._accepted_times.append(now)
+            self.accepted_count += 1
+            return True
+
+    def _create_handler(self):
+        """
+        Creates the request handler class bound to this server.
+        """
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                if not standin._accept():
+                    self.send_response(429)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if standin.latency:
+                    time.sleep(standin.latency)
+                data = payload['text'].upper().encode('UTF-8')
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == '__main__':
+    import sys
+
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    server = StandinTranslationServer(limit, latency=0.05)
+    server.start()
+    print(f"Stand-in translation server at {server.url} ({limit} requests per second)", flush=True)
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        server.stop()